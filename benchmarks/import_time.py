@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import sys
+import time
+
+start = time.perf_counter()
+import comfyui_viewer
+package_ms = (time.perf_counter() - start) * 1000.0
+start = time.perf_counter()
+import comfyui_viewer.cache
+import comfyui_viewer.favorites
+import comfyui_viewer.library
+import comfyui_viewer.metadata
+core_ms = (time.perf_counter() - start) * 1000.0 + package_ms
+
+import json
+
+qt_loaded = sorted(name for name in sys.modules if name.split(".")[0] == "PyQt6")
+unexpected = sorted(
+    name for name in ("hashlib", "http.server", "concurrent.futures")
+    if name in sys.modules
+)
+print(
+    json.dumps(
+        {
+            "package_ms": package_ms,
+            "core_ms": core_ms,
+            "qt": qt_loaded,
+            "unexpected": unexpected,
+        }
+    )
+)
+"""
+
+
+def run_probe(*options):
+    return subprocess.run(
+        [sys.executable, *options, "-c", PROBE],
+        cwd=REPO_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def measure(runs):
+    return [json.loads(run_probe().stdout) for _ in range(runs)]
+
+
+def breakdown(limit):
+    rows = []
+    children = []
+    for line in run_probe("-X", "importtime").stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if depth == 1:
+            children.append((int(parts[1]) / 1000.0, name))
+        elif depth == 0:
+            if name.startswith("comfyui_viewer"):
+                rows.extend(children)
+                self_ms = int(parts[0].split(":")[1]) / 1000.0
+                rows.append((self_ms, f"{name} (own code)"))
+            children = []
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure cold import time of the Qt-free core package"
+    )
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--package-budget-ms", type=float, default=5.0)
+    parser.add_argument("--core-budget-ms", type=float, default=20.0)
+    parser.add_argument("--breakdown", type=int, default=8)
+    args = parser.parse_args()
+
+    samples = measure(args.runs)
+    package_ms = min(sample["package_ms"] for sample in samples)
+    core_ms = min(sample["core_ms"] for sample in samples)
+    qt_loaded = sorted({name for sample in samples for name in sample["qt"]})
+    unexpected = sorted({name for sample in samples for name in sample["unexpected"]})
+    print(f"import comfyui_viewer: {package_ms:.2f} ms (budget {args.package_budget_ms} ms)")
+    print(f"cold core import:      {core_ms:.2f} ms (budget {args.core_budget_ms} ms)")
+    if args.breakdown > 0:
+        print("slowest imports made by the package:")
+        for elapsed_ms, name in breakdown(args.breakdown):
+            print(f"  {elapsed_ms:7.2f} ms  {name}")
+
+    failures = []
+    if qt_loaded:
+        failures.append(f"core imported Qt modules: {', '.join(qt_loaded)}")
+    if unexpected:
+        failures.append(f"core eagerly imported {', '.join(unexpected)}")
+    if package_ms > args.package_budget_ms:
+        failures.append("package import over budget")
+    if core_ms > args.core_budget_ms:
+        failures.append("cold core import over budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comfyui_viewer import (  # noqa: E402
+    decode_metadata,
+    extract_metadata,
+    get_cached_metadata,
+    open_cache,
+    update_metadata_cache,
+)
+
+LEGACY_SCHEMA = """
+CREATE TABLE file_cache (
+    date TEXT NOT NULL,
+    number TEXT NOT NULL,
+    path TEXT NOT NULL,
+    metadata_json TEXT,
+    ckpt_name TEXT,
+    sampler_name1 TEXT,
+    sampler_name2 TEXT,
+    PRIMARY KEY (date, number)
+)
+"""
+
+NODE_TYPES = [
+    ("KSampler", ["seed", "steps", "cfg", "sampler_name", "scheduler", "denoise"]),
+    ("CheckpointLoaderSimple", ["ckpt_name"]),
+    ("CLIPTextEncode", ["text"]),
+    ("LoraLoader", ["lora_name", "strength_model", "strength_clip"]),
+    ("EmptyLatentImage", ["width", "height", "batch_size"]),
+    ("VAEDecode", []),
+    ("SaveImage", ["filename_prefix"]),
+]
+
+WORDS = "masterpiece detailed portrait landscape cinematic lighting soft bokeh".split()
+
+
+def synthetic_workflow(rng, target_bytes):
+    prompt = {}
+    node_id = 1
+    size = 0
+    while size < target_bytes:
+        class_type, keys = rng.choice(NODE_TYPES)
+        inputs = {}
+        for key in keys:
+            if key == "text":
+                inputs[key] = " ".join(rng.choice(WORDS) for _ in range(60))
+            elif key in ("seed", "steps", "width", "height", "batch_size"):
+                inputs[key] = rng.randint(1, 2**32)
+            elif key in ("cfg", "denoise", "strength_model", "strength_clip"):
+                inputs[key] = round(rng.random() * 10, 2)
+            else:
+                inputs[key] = f"{key}_{rng.randint(0, 20)}.safetensors"
+        inputs["model"] = [str(max(1, node_id - 1)), 0]
+        prompt[str(node_id)] = {"class_type": class_type, "inputs": inputs}
+        size += len(json.dumps(prompt[str(node_id)], indent=2))
+        node_id += 1
+    return json.dumps(prompt, indent=2, ensure_ascii=False)
+
+
+def db_size(base_dir):
+    path = os.path.join(base_dir, "cache", "db.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare cache DB size for legacy vs compact metadata storage"
+    )
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--workflow-kb", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as base_dir:
+        os.makedirs(os.path.join(base_dir, "cache"))
+        conn = sqlite3.connect(os.path.join(base_dir, "cache", "db.sqlite"))
+        conn.execute(LEGACY_SCHEMA)
+        paths = []
+        for index in range(args.rows):
+            path = os.path.join(base_dir, "2024-01-01", f"ComfyUI_{index:05d}_.png")
+            paths.append(path)
+            conn.execute(
+                "INSERT INTO file_cache (date, number, path, metadata_json) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    "2024-01-01",
+                    f"{index:05d}",
+                    path,
+                    synthetic_workflow(rng, args.workflow_kb * 1024),
+                ),
+            )
+        conn.commit()
+        conn.close()
+        before = db_size(base_dir)
+
+        start = time.perf_counter()
+        conn = open_cache(base_dir)
+        migrate_s = time.perf_counter() - start
+        conn.close()
+        after = db_size(base_dir)
+
+        conn = open_cache(base_dir)
+        start = time.perf_counter()
+        rows = conn.execute("SELECT path, metadata_json FROM file_cache").fetchall()
+        for path, value in rows:
+            json_text = decode_metadata(value)
+            ckpt_name, sampler_names, params = extract_metadata(json_text)
+            update_metadata_cache(
+                conn, path, json_text, ckpt_name, sampler_names, params
+            )
+        index_s = time.perf_counter() - start
+        param_rows = conn.execute("SELECT COUNT(*) FROM node_params").fetchone()[0]
+        conn.close()
+        indexed = db_size(base_dir)
+
+        os.makedirs(os.path.join(base_dir, "2024-01-01"))
+        open(paths[0], "wb").close()
+        conn = open_cache(base_dir)
+        start = time.perf_counter()
+        cached = get_cached_metadata(conn, paths[0])
+        read_ms = (time.perf_counter() - start) * 1000.0
+        conn.close()
+        json.loads(cached["metadata_json"])
+
+    print(f"rows: {args.rows}, workflow size: ~{args.workflow_kb} KB pretty-printed")
+    print(f"legacy DB size:   {before / 1024 / 1024:8.2f} MiB")
+    print(f"compact DB size:  {after / 1024 / 1024:8.2f} MiB ({after / before:.1%})")
+    print(f"indexed DB size:  {indexed / 1024 / 1024:8.2f} MiB ({indexed / before:.1%})")
+    print(f"migration time:   {migrate_s:8.2f} s")
+    print(f"param index time: {index_s:8.2f} s ({param_rows} node_params rows)")
+    print(f"single row read:  {read_ms:8.2f} ms (decompress included)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import importlib
+
+_EXPORTS = {
+    "get_cached_metadata": "cache",
+    "get_cached_path": "cache",
+    "get_node_params": "cache",
+    "delete_node_params": "cache",
+    "count_param_values": "cache",
+    "open_cache": "cache",
+    "JOURNAL_MODES": "cache",
+    "is_network_path": "cache",
+    "resolve_journal_mode": "cache",
+    "update_cache": "cache",
+    "update_metadata_cache": "cache",
+    "get_meta": "cache",
+    "set_meta": "cache",
+    "encode_metadata": "cache",
+    "decode_metadata": "cache",
+    "parse_fav_yaml": "favorites",
+    "add_favorite": "favorites",
+    "export_fav_yaml": "favorites",
+    "fav_yaml_mtime": "favorites",
+    "import_fav_yaml": "favorites",
+    "is_favorite": "favorites",
+    "load_favorite_sections": "favorites",
+    "remove_favorite": "favorites",
+    "write_fav_yaml": "favorites",
+    "maintain_cache": "maintenance",
+    "format_report": "maintenance",
+    "DEFAULT_ROOT_CONCURRENCY": "library",
+    "ANIMATED_EXTS": "library",
+    "IMAGE_EXTS": "library",
+    "LibraryRoot": "library",
+    "RootConfigError": "library",
+    "check_root_dir": "library",
+    "ensure_metadata": "library",
+    "find_file_for_number": "library",
+    "is_image_file": "library",
+    "load_roots_config": "library",
+    "merge_sections": "library",
+    "export_rows": "export",
+    "iter_export_rows": "export",
+    "make_server": "server",
+    "warm_thumbnails": "server",
+    "ensure_thumbnail": "thumbnails",
+    "PNG_SIGNATURE": "metadata",
+    "extract_json_from_bytes": "metadata",
+    "extract_json_from_file": "metadata",
+    "extract_json_from_png": "metadata",
+    "extract_json_from_text": "metadata",
+    "extract_metadata": "metadata",
+    "iter_node_params": "metadata",
+    "minify_json_text": "metadata",
+    "pretty_json_text": "metadata",
+    "extract_metadata_fields": "metadata",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,435 @@
+import os
+import sqlite3
+import sys
+import zlib
+
+from .metadata import minify_json_text
+
+SCHEMA_VERSION = 2
+METADATA_ZLIB_TAG = b"zlib:"
+METADATA_COMPRESS_MIN = 256
+MIGRATION_BATCH_SIZE = 200
+JOURNAL_MODES = ("auto", "wal", "delete")
+NETWORK_FILESYSTEMS = {
+    "9p",
+    "afpfs",
+    "ceph",
+    "cifs",
+    "davfs",
+    "fuse.glusterfs",
+    "fuse.rclone",
+    "fuse.sshfs",
+    "glusterfs",
+    "ncpfs",
+    "nfs",
+    "nfs4",
+    "smb3",
+    "smbfs",
+}
+DRIVE_REMOTE = 4
+
+
+def _ensure_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, declaration in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration}")
+
+
+def encode_metadata(text):
+    if not text:
+        return text
+    data = text.encode("utf-8")
+    if len(data) < METADATA_COMPRESS_MIN:
+        return text
+    return METADATA_ZLIB_TAG + zlib.compress(data, 6)
+
+
+def decode_metadata(value):
+    if isinstance(value, bytes):
+        if value.startswith(METADATA_ZLIB_TAG):
+            try:
+                value = zlib.decompress(value[len(METADATA_ZLIB_TAG) :])
+            except zlib.error:
+                return None
+        return value.decode("utf-8", errors="replace")
+    return value
+
+
+def _migrate_metadata(conn):
+    rowids = [
+        row[0]
+        for row in conn.execute(
+            """
+            SELECT rowid FROM file_cache
+            WHERE typeof(metadata_json) = 'text' AND metadata_json != ''
+            """
+        )
+    ]
+    for start in range(0, len(rowids), MIGRATION_BATCH_SIZE):
+        batch = rowids[start : start + MIGRATION_BATCH_SIZE]
+        placeholders = ", ".join("?" for _ in batch)
+        rows = conn.execute(
+            f"SELECT rowid, metadata_json FROM file_cache WHERE rowid IN ({placeholders})",
+            batch,
+        ).fetchall()
+        conn.executemany(
+            "UPDATE file_cache SET metadata_json = ? WHERE rowid = ?",
+            [(encode_metadata(minify_json_text(text)), rowid) for rowid, text in rows],
+        )
+        conn.commit()
+
+
+def _create_param_tables(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS param_files (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS node_params (
+            file_id INTEGER NOT NULL,
+            node_id TEXT NOT NULL,
+            class_type TEXT,
+            key TEXT NOT NULL,
+            value,
+            PRIMARY KEY (file_id, node_id, key)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS node_params_key ON node_params (key, value)"
+    )
+
+
+def _migrate_node_params(conn):
+    conn.execute("UPDATE file_cache SET params_indexed = NULL")
+    conn.execute("DROP TABLE IF EXISTS node_params")
+    conn.execute("DELETE FROM param_files")
+    _create_param_tables(conn)
+    conn.commit()
+
+
+def _migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    if version < 1:
+        _migrate_metadata(conn)
+    if version < 2:
+        _migrate_node_params(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+
+def _mount_fstype(path):
+    try:
+        with open("/proc/self/mounts", "r", encoding="utf-8") as handle:
+            mounts = [line.split()[1:3] for line in handle]
+    except OSError:
+        return None
+    real = os.path.realpath(path)
+    best = None
+    for fields in mounts:
+        if len(fields) < 2:
+            continue
+        mount_point = fields[0].replace("\\040", " ")
+        prefix = mount_point.rstrip("/") + "/"
+        if real != mount_point and not real.startswith(prefix):
+            continue
+        if best is None or len(mount_point) > len(best[0]):
+            best = (mount_point, fields[1])
+    return best[1] if best else None
+
+
+def is_network_path(path):
+    if os.name == "nt":
+        drive = os.path.splitdrive(os.path.abspath(path))[0]
+        if drive.startswith("\\\\"):
+            return True
+        try:
+            import ctypes
+
+            return ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE
+        except (AttributeError, OSError):
+            return False
+    if sys.platform.startswith("linux"):
+        return _mount_fstype(path) in NETWORK_FILESYSTEMS
+    return False
+
+
+def resolve_journal_mode(base_dir, journal_mode="auto"):
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"journal_mode must be one of {', '.join(JOURNAL_MODES)}")
+    if journal_mode == "auto":
+        return "delete" if is_network_path(base_dir) else "wal"
+    return journal_mode
+
+
+def open_cache(base_dir, journal_mode="auto", check_same_thread=True):
+    if not os.path.isdir(base_dir):
+        raise FileNotFoundError(f"library root not found: {base_dir}")
+    journal_mode = resolve_journal_mode(base_dir, journal_mode)
+    cache_dir = os.path.join(base_dir, "cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, "db.sqlite")
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+    try:
+        conn.execute(f"PRAGMA journal_mode={journal_mode.upper()}")
+    except sqlite3.Error:
+        pass
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS file_cache (
+            date TEXT NOT NULL,
+            number TEXT NOT NULL,
+            path TEXT NOT NULL,
+            metadata_json TEXT,
+            ckpt_name TEXT,
+            sampler_name1 TEXT,
+            sampler_name2 TEXT,
+            PRIMARY KEY (date, number)
+        )
+        """
+    )
+    _ensure_columns(conn, "file_cache", [("params_indexed", "INTEGER")])
+    _create_param_tables(conn)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS favorites (
+            date TEXT NOT NULL,
+            number TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (date, number)
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS favorites_position ON favorites (position)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cache_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        """
+    )
+    conn.commit()
+    try:
+        _migrate(conn)
+    except sqlite3.Error:
+        conn.rollback()
+    return conn
+
+
+def get_meta(conn, key, default=None):
+    try:
+        row = conn.execute(
+            "SELECT value FROM cache_meta WHERE key = ?", (key,)
+        ).fetchone()
+    except sqlite3.Error:
+        return default
+    return row[0] if row else default
+
+
+def set_meta(conn, key, value):
+    conn.execute(
+        "INSERT OR REPLACE INTO cache_meta (key, value) VALUES (?, ?)", (key, value)
+    )
+
+
+def get_cached_path(conn, date, number):
+    if conn is None:
+        return None
+    try:
+        row = conn.execute(
+            "SELECT path FROM file_cache WHERE date = ? AND number = ?",
+            (date, number),
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    if not row:
+        return None
+    path = row[0]
+    if path and os.path.exists(path):
+        return path
+    if path:
+        try:
+            conn.execute(
+                "DELETE FROM file_cache WHERE date = ? AND number = ?",
+                (date, number),
+            )
+            delete_node_params(conn, path)
+            conn.commit()
+        except sqlite3.Error:
+            return None
+    return None
+
+
+def get_cached_metadata(conn, path):
+    if conn is None or not path:
+        return None
+    if not os.path.exists(path):
+        try:
+            conn.execute("DELETE FROM file_cache WHERE path = ?", (path,))
+            delete_node_params(conn, path)
+            conn.commit()
+        except sqlite3.Error:
+            return None
+        return None
+    try:
+        row = conn.execute(
+            """
+            SELECT metadata_json, ckpt_name, sampler_name1, sampler_name2,
+                params_indexed
+            FROM file_cache
+            WHERE path = ?
+            """,
+            (path,),
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    metadata_json, ckpt_name, sampler1, sampler2, params_indexed = row
+    if (
+        metadata_json is None
+        and ckpt_name is None
+        and sampler1 is None
+        and sampler2 is None
+    ):
+        return None
+    samplers = [value for value in (sampler1, sampler2) if value]
+    return {
+        "metadata_json": decode_metadata(metadata_json),
+        "ckpt_name": ckpt_name,
+        "samplers": samplers,
+        "params_indexed": bool(params_indexed),
+    }
+
+
+def delete_node_params(conn, path):
+    conn.execute(
+        """
+        DELETE FROM node_params
+        WHERE file_id IN (SELECT id FROM param_files WHERE path = ?)
+        """,
+        (path,),
+    )
+    conn.execute("DELETE FROM param_files WHERE path = ?", (path,))
+
+
+def update_cache(conn, date, number, path):
+    if conn is None or not path:
+        return
+    try:
+        row = conn.execute(
+            "SELECT path FROM file_cache WHERE date = ? AND number = ?",
+            (date, number),
+        ).fetchone()
+        if row is None:
+            conn.execute(
+                "INSERT INTO file_cache (date, number, path) VALUES (?, ?, ?)",
+                (date, number, path),
+            )
+        elif row[0] != path:
+            conn.execute(
+                """
+                UPDATE file_cache
+                SET path = ?, metadata_json = NULL, ckpt_name = NULL,
+                    sampler_name1 = NULL, sampler_name2 = NULL,
+                    params_indexed = NULL
+                WHERE date = ? AND number = ?
+                """,
+                (path, date, number),
+            )
+            delete_node_params(conn, row[0])
+        conn.commit()
+    except sqlite3.Error:
+        return
+
+
+def update_metadata_cache(
+    conn, path, metadata_json, ckpt_name, sampler_names, params=None
+):
+    if conn is None or not path:
+        return
+    sampler1 = sampler_names[0] if len(sampler_names) > 0 else None
+    sampler2 = sampler_names[1] if len(sampler_names) > 1 else None
+    params_indexed = 1 if params is not None else None
+    try:
+        conn.execute(
+            """
+            UPDATE file_cache
+            SET metadata_json = ?, ckpt_name = ?, sampler_name1 = ?, sampler_name2 = ?,
+                params_indexed = ?
+            WHERE path = ?
+            """,
+            (
+                encode_metadata(metadata_json),
+                ckpt_name,
+                sampler1,
+                sampler2,
+                params_indexed,
+                path,
+            ),
+        )
+        if params is not None:
+            delete_node_params(conn, path)
+            if params:
+                file_id = conn.execute(
+                    "INSERT INTO param_files (path) VALUES (?)", (path,)
+                ).lastrowid
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO node_params
+                        (file_id, node_id, class_type, key, value)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (file_id, node_id, class_type, key, value)
+                        for node_id, class_type, key, value in params
+                    ],
+                )
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        return
+
+
+def get_node_params(conn, path):
+    if conn is None or not path:
+        return []
+    try:
+        return conn.execute(
+            """
+            SELECT p.node_id, p.class_type, p.key, p.value
+            FROM node_params AS p
+            JOIN param_files AS f ON f.id = p.file_id
+            WHERE f.path = ?
+            ORDER BY CAST(p.node_id AS INTEGER), p.node_id, p.key
+            """,
+            (path,),
+        ).fetchall()
+    except sqlite3.Error:
+        return []
+
+
+def count_param_values(conn, key, class_type=None):
+    if conn is None:
+        return []
+    query = "SELECT value, COUNT(DISTINCT file_id) FROM node_params WHERE key = ?"
+    args = [key]
+    if class_type is not None:
+        query += " AND class_type = ?"
+        args.append(class_type)
+    query += " GROUP BY value ORDER BY COUNT(DISTINCT file_id) DESC"
+    try:
+        return conn.execute(query, args).fetchall()
+    except sqlite3.Error:
+        return []
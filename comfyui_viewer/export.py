@@ -0,0 +1,223 @@
+import collections
+import csv
+import functools
+import json
+import sqlite3
+
+from .favorites import parse_fav_yaml
+from .library import ensure_metadata, find_file_for_number
+
+EXPORT_BATCH_SIZE = 256
+BASE_FIELDS = [
+    "root",
+    "date",
+    "number",
+    "path",
+    "ckpt_name",
+    "sampler_name1",
+    "sampler_name2",
+]
+
+EXPORT_QUERY = """
+SELECT f.date, f.number, c.path, c.ckpt_name, c.sampler_name1, c.sampler_name2,
+    c.path IS NULL
+        OR (c.params_indexed IS NULL AND COALESCE(length(c.metadata_json), 1) > 0)
+FROM {favorites} AS f
+LEFT JOIN file_cache AS c ON c.date = f.date AND c.number = f.number
+{where}
+ORDER BY f.position
+"""
+
+
+def _load_export_keys(conn, fav_path):
+    conn.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS export_keys (
+            date TEXT NOT NULL,
+            number TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (date, number)
+        )
+        """
+    )
+    conn.execute("DELETE FROM temp.export_keys")
+    keys = (
+        (section["date"], number)
+        for section in parse_fav_yaml(fav_path)
+        for number in section["numbers"]
+    )
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO temp.export_keys (date, number, position)
+        VALUES (?, ?, ?)
+        """,
+        ((date, number, position) for position, (date, number) in enumerate(keys)),
+    )
+    conn.commit()
+
+
+def iter_cache_rows(root, since=None, until=None, batch_size=EXPORT_BATCH_SIZE):
+    conn = root.connection()
+    if root.favorites_store:
+        favorites = "favorites"
+    else:
+        _load_export_keys(conn, root.fav_path)
+        favorites = "temp.export_keys"
+    clauses = []
+    args = []
+    if since is not None:
+        clauses.append("f.date >= ?")
+        args.append(since)
+    if until is not None:
+        clauses.append("f.date <= ?")
+        args.append(until)
+    where = "WHERE " + " AND ".join(clauses) if clauses else ""
+    cursor = conn.execute(EXPORT_QUERY.format(favorites=favorites, where=where), args)
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for date, number, path, ckpt, sampler1, sampler2, needs_fill in rows:
+                yield {
+                    "root": root.base_dir,
+                    "date": date,
+                    "number": number,
+                    "path": path,
+                    "ckpt_name": ckpt,
+                    "sampler_name1": sampler1,
+                    "sampler_name2": sampler2,
+                    "_needs_fill": bool(needs_fill),
+                }
+    finally:
+        cursor.close()
+        if not root.favorites_store:
+            conn.execute("DROP TABLE IF EXISTS temp.export_keys")
+
+
+def fill_row(root, row, params=()):
+    needs_fill = row.pop("_needs_fill")
+    if not needs_fill and not params:
+        return row
+    conn = root.thread_conn()
+    if needs_fill:
+        path = row["path"] or find_file_for_number(
+            root.base_dir, row["date"], row["number"], conn
+        )
+        row["path"] = path
+        if path:
+            try:
+                _, ckpt_name, sampler_names = ensure_metadata(conn, path)
+            except OSError:
+                ckpt_name, sampler_names = None, []
+            row["ckpt_name"] = ckpt_name
+            row["sampler_name1"] = sampler_names[0] if sampler_names else None
+            row["sampler_name2"] = (
+                sampler_names[1] if len(sampler_names) > 1 else None
+            )
+    if params:
+        values = {}
+        if row["path"] and conn is not None:
+            placeholders = ", ".join("?" for _ in params)
+            try:
+                for key, value in conn.execute(
+                    f"""
+                    SELECT p.key, p.value
+                    FROM node_params AS p
+                    JOIN param_files AS f ON f.id = p.file_id
+                    WHERE f.path = ? AND p.key IN ({placeholders})
+                    ORDER BY CAST(p.node_id AS INTEGER), p.node_id
+                    """,
+                    [row["path"], *params],
+                ):
+                    values.setdefault(key, value)
+            except sqlite3.Error:
+                pass
+        for key in params:
+            row[key] = values.get(key)
+    return row
+
+
+def ordered_map(func, items, executor=None, window=1, inline=None):
+    if executor is None or window <= 1:
+        for item in items:
+            yield func(item)
+        return
+    pending = collections.deque()
+    for item in items:
+        if inline is not None and inline(item):
+            if not pending:
+                yield func(item)
+                continue
+            pending.append((None, func(item)))
+        else:
+            pending.append((executor.submit(func, item), None))
+        if len(pending) >= window:
+            yield _pending_result(*pending.popleft())
+    while pending:
+        yield _pending_result(*pending.popleft())
+
+
+def _pending_result(future, result):
+    return result if future is None else future.result()
+
+
+def check_params(params):
+    params = list(dict.fromkeys(params))
+    clashes = [key for key in params if key in BASE_FIELDS or key.startswith("_")]
+    if clashes:
+        raise ValueError(f"param keys clash with export columns: {', '.join(clashes)}")
+    return params
+
+
+def iter_export_rows(roots, since=None, until=None, params=(), fill=True, workers=1):
+    params = check_params(params)
+    return _iter_export_rows(roots, since, until, params, fill, workers)
+
+
+def _iter_export_rows(roots, since, until, params, fill, workers):
+    for root in roots:
+        rows = iter_cache_rows(root, since, until)
+        if not fill:
+            rows = (dict(row, _needs_fill=False) for row in rows)
+        yield from ordered_map(
+            functools.partial(fill_row, root, params=params),
+            rows,
+            root.executor,
+            workers,
+            inline=None if params else _is_complete,
+        )
+
+
+def _is_complete(row):
+    return not row["_needs_fill"]
+
+
+def write_jsonl(rows, handle):
+    count = 0
+    for row in rows:
+        handle.write(json.dumps(row, ensure_ascii=False))
+        handle.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(rows, handle, fieldnames):
+    writer = csv.DictWriter(handle, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def export_rows(roots, handle, fmt="jsonl", params=(), **options):
+    params = check_params(params)
+    rows = iter_export_rows(roots, params=params, **options)
+    try:
+        if fmt == "csv":
+            return write_csv(rows, handle, BASE_FIELDS + params)
+        return write_jsonl(rows, handle)
+    finally:
+        rows.close()
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+
+from .cache import set_meta
+
+
+def parse_fav_yaml(path):
+    sections = []
+    section_index = {}
+    section_seen = {}
+    current_date = None
+    if not os.path.exists(path):
+        return sections
+
+    with open(path, "r", encoding="utf-8") as handle:
+        for raw_line in handle:
+            line = raw_line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if not line.startswith("-") and line.endswith(":"):
+                date = line[:-1].strip()
+                if not date:
+                    current_date = None
+                    continue
+                current_date = date
+                if date not in section_index:
+                    entry = {"date": date, "numbers": []}
+                    section_index[date] = entry
+                    section_seen[date] = set()
+                    sections.append(entry)
+                continue
+            if not line.startswith("-") or not current_date:
+                continue
+            value = line[1:].strip()
+            if not value:
+                continue
+            entry = section_index.get(current_date)
+            seen = section_seen.get(current_date)
+            if entry and value not in seen:
+                seen.add(value)
+                entry["numbers"].append(value)
+    return sections
+
+
+def fav_yaml_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def in_date_range(date, start=None, end=None):
+    if start is not None and date < start:
+        return False
+    if end is not None and date > end:
+        return False
+    return True
+
+
+def import_favorites(conn, sections):
+    rows = []
+    for section in sections:
+        for number in section["numbers"]:
+            rows.append((section["date"], number, len(rows) + 1))
+    conn.execute("DELETE FROM favorites")
+    conn.executemany(
+        "INSERT OR IGNORE INTO favorites (date, number, position) VALUES (?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def import_fav_yaml(conn, path):
+    return import_favorites(conn, parse_fav_yaml(path))
+
+
+def load_favorite_sections(conn, start=None, end=None):
+    query = "SELECT date, number FROM favorites"
+    clauses = []
+    args = []
+    if start is not None:
+        clauses.append("date >= ?")
+        args.append(start)
+    if end is not None:
+        clauses.append("date <= ?")
+        args.append(end)
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY position"
+    sections = []
+    section_index = {}
+    for date, number in conn.execute(query, args):
+        entry = section_index.get(date)
+        if entry is None:
+            entry = {"date": date, "numbers": []}
+            section_index[date] = entry
+            sections.append(entry)
+        entry["numbers"].append(number)
+    return sections
+
+
+def write_fav_yaml(path, sections):
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            for section in sections:
+                if not section["numbers"]:
+                    continue
+                handle.write(f"{section['date']}:\n")
+                for number in section["numbers"]:
+                    handle.write(f"  - {number}\n")
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def export_fav_yaml(conn, path):
+    sections = load_favorite_sections(conn)
+    write_fav_yaml(path, sections)
+    return sum(len(section["numbers"]) for section in sections)
+
+
+def is_favorite(conn, date, number):
+    try:
+        row = conn.execute(
+            "SELECT 1 FROM favorites WHERE date = ? AND number = ?", (date, number)
+        ).fetchone()
+    except sqlite3.Error:
+        return False
+    return row is not None
+
+
+def add_favorite(conn, date, number):
+    try:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO favorites (date, number, position)
+            SELECT ?, ?, COALESCE(MAX(position), 0) + 1 FROM favorites
+            """,
+            (date, number),
+        )
+        set_meta(conn, "favorites_edited", "1")
+        conn.commit()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def remove_favorite(conn, date, number):
+    try:
+        conn.execute(
+            "DELETE FROM favorites WHERE date = ? AND number = ?", (date, number)
+        )
+        set_meta(conn, "favorites_edited", "1")
+        conn.commit()
+    except sqlite3.Error:
+        return False
+    return True
@@ -0,0 +1,854 @@
+import functools
+import os
+import sqlite3
+import sys
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+from .favorites import add_favorite, remove_favorite
+from .library import ANIMATED_EXTS, ensure_metadata, merge_sections
+from .maintenance import format_report
+from .metadata import pretty_json_text
+
+QT6 = True
+
+ZOOM_MIN = 0.05
+ZOOM_MAX = 8.0
+
+CARD_COLUMN_WIDTH = 260
+REFLOW_DELAY_MS = 150
+MAINTENANCE_IDLE_MS = 5 * 60 * 1000
+
+ANIMATE_ON_HOVER = True
+CARD_FRAME_BUDGET = 8 * 1024 * 1024
+DIALOG_FRAME_BUDGET = 128 * 1024 * 1024
+
+
+def qt_align_center():
+    return QtCore.Qt.AlignmentFlag.AlignCenter if QT6 else QtCore.Qt.AlignCenter
+
+
+def qt_keep_aspect():
+    return (
+        QtCore.Qt.AspectRatioMode.KeepAspectRatio
+        if QT6
+        else QtCore.Qt.KeepAspectRatio
+    )
+
+
+def qt_smooth():
+    return (
+        QtCore.Qt.TransformationMode.SmoothTransformation
+        if QT6
+        else QtCore.Qt.SmoothTransformation
+    )
+
+
+def qt_frame_styled_panel():
+    return (
+        QtWidgets.QFrame.Shape.StyledPanel
+        if QT6
+        else QtWidgets.QFrame.StyledPanel
+    )
+
+
+def qt_cursor_pointing():
+    return (
+        QtCore.Qt.CursorShape.PointingHandCursor
+        if QT6
+        else QtCore.Qt.PointingHandCursor
+    )
+
+
+def qt_cursor_arrow():
+    return (
+        QtCore.Qt.CursorShape.ArrowCursor if QT6 else QtCore.Qt.ArrowCursor
+    )
+
+
+def qt_mouse_left():
+    return (
+        QtCore.Qt.MouseButton.LeftButton if QT6 else QtCore.Qt.LeftButton
+    )
+
+
+def qt_focus_strong():
+    return (
+        QtCore.Qt.FocusPolicy.StrongFocus if QT6 else QtCore.Qt.StrongFocus
+    )
+
+
+def qt_graphics_drag_hand():
+    return (
+        QtWidgets.QGraphicsView.DragMode.ScrollHandDrag
+        if QT6
+        else QtWidgets.QGraphicsView.ScrollHandDrag
+    )
+
+
+def qt_anchor_under_mouse():
+    return (
+        QtWidgets.QGraphicsView.ViewportAnchor.AnchorUnderMouse
+        if QT6
+        else QtWidgets.QGraphicsView.AnchorUnderMouse
+    )
+
+
+def qt_event_resize():
+    return QtCore.QEvent.Type.Resize if QT6 else QtCore.QEvent.Resize
+
+
+def qt_user_input_events():
+    types = QtCore.QEvent.Type if QT6 else QtCore.QEvent
+    return (types.KeyPress, types.MouseButtonPress, types.Wheel)
+
+
+def qt_message_yes():
+    return (
+        QtWidgets.QMessageBox.StandardButton.Yes if QT6 else QtWidgets.QMessageBox.Yes
+    )
+
+
+def qt_message_no():
+    return QtWidgets.QMessageBox.StandardButton.No if QT6 else QtWidgets.QMessageBox.No
+
+
+def qt_movie_cache_all():
+    return QtGui.QMovie.CacheMode.CacheAll if QT6 else QtGui.QMovie.CacheAll
+
+
+def qt_movie_cache_none():
+    return QtGui.QMovie.CacheMode.CacheNone if QT6 else QtGui.QMovie.CacheNone
+
+
+def qt_painter_smooth():
+    return (
+        QtGui.QPainter.RenderHint.SmoothPixmapTransform
+        if QT6
+        else QtGui.QPainter.SmoothPixmapTransform
+    )
+
+
+def open_animation(path, budget_bytes, fit_size=None):
+    if not path or os.path.splitext(path)[1].lower() not in ANIMATED_EXTS:
+        return None
+    reader = QtGui.QImageReader(path)
+    if not reader.supportsAnimation() or reader.imageCount() == 1:
+        return None
+    movie = QtGui.QMovie(path)
+    if not movie.isValid():
+        return None
+    size = reader.size()
+    if fit_size is not None and size.isValid():
+        size = size.scaled(fit_size, qt_keep_aspect())
+        movie.setScaledSize(size)
+    frames = movie.frameCount()
+    frame_bytes = max(1, size.width()) * max(1, size.height()) * 4
+    if 0 < frames and frames * frame_bytes <= budget_bytes:
+        movie.setCacheMode(qt_movie_cache_all())
+    else:
+        movie.setCacheMode(qt_movie_cache_none())
+    return movie
+
+
+class ImageView(QtWidgets.QGraphicsView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._zoom = 1.0
+        scene = QtWidgets.QGraphicsScene(self)
+        self.setScene(scene)
+        self._pixmap_item = QtWidgets.QGraphicsPixmapItem()
+        scene.addItem(self._pixmap_item)
+        self.setBackgroundBrush(QtGui.QColor(18, 18, 18))
+        self.setRenderHint(qt_painter_smooth())
+        self.setDragMode(qt_graphics_drag_hand())
+        self.setTransformationAnchor(qt_anchor_under_mouse())
+        self.setResizeAnchor(qt_anchor_under_mouse())
+
+    def set_pixmap(self, pixmap):
+        self._pixmap_item.setPixmap(pixmap)
+        self.scene().setSceneRect(QtCore.QRectF(pixmap.rect()))
+        self._zoom = 1.0
+        self.resetTransform()
+
+    def update_frame(self, pixmap):
+        self._pixmap_item.setPixmap(pixmap)
+
+    def set_zoom(self, value):
+        self._zoom = max(ZOOM_MIN, min(ZOOM_MAX, value))
+        self.resetTransform()
+        self.scale(self._zoom, self._zoom)
+
+    def adjust_zoom(self, delta):
+        self.set_zoom(self._zoom + delta)
+
+    def wheelEvent(self, event):
+        delta = event.angleDelta().y()
+        if delta == 0:
+            super().wheelEvent(event)
+            return
+        factor = 1.25 if delta > 0 else 0.8
+        new_zoom = self._zoom * factor
+        if ZOOM_MIN <= new_zoom <= ZOOM_MAX:
+            self._zoom = new_zoom
+            self.scale(factor, factor)
+        event.accept()
+
+    def fit_to_view(self):
+        pixmap = self._pixmap_item.pixmap()
+        if pixmap.isNull():
+            return
+        view_rect = self.viewport().rect()
+        pixmap_rect = self._pixmap_item.boundingRect()
+        if (
+            view_rect.width() <= 0
+            or view_rect.height() <= 0
+            or pixmap_rect.width() <= 0
+            or pixmap_rect.height() <= 0
+        ):
+            return
+        scale = min(
+            view_rect.width() / pixmap_rect.width(),
+            view_rect.height() / pixmap_rect.height(),
+            1.0,
+        )
+        self._zoom = scale
+        self.resetTransform()
+        self.scale(scale, scale)
+
+
+class ImageDialog(QtWidgets.QDialog):
+    def __init__(self, path, title, cache_conn=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Preview")
+        self.resize(1000, 700)
+        self.path = path
+        self.cache_conn = cache_conn
+        self.movie = None
+        self.original_pixmap = QtGui.QPixmap(path) if path else QtGui.QPixmap()
+
+        layout = QtWidgets.QVBoxLayout(self)
+        header = QtWidgets.QHBoxLayout()
+        layout.addLayout(header)
+
+        text_wrap = QtWidgets.QVBoxLayout()
+        header.addLayout(text_wrap)
+        header.addStretch()
+
+        title_label = QtWidgets.QLabel(title)
+        title_label.setStyleSheet("font-weight: 600; font-size: 16px;")
+        self.path_label = QtWidgets.QLabel(path or "")
+        self.path_label.setWordWrap(True)
+        self.path_label.setStyleSheet("color: #9aa0a6;")
+        text_wrap.addWidget(title_label)
+        text_wrap.addWidget(self.path_label)
+
+        close_btn = QtWidgets.QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        header.addWidget(close_btn)
+
+        body = QtWidgets.QHBoxLayout()
+        layout.addLayout(body, 1)
+
+        self.image_view = ImageView()
+        self.image_view.setMinimumHeight(320)
+        body.addWidget(self.image_view, 3)
+
+        meta_container = QtWidgets.QWidget()
+        meta_layout = QtWidgets.QVBoxLayout(meta_container)
+        meta_layout.setContentsMargins(0, 0, 0, 0)
+        meta_layout.setSpacing(6)
+
+        meta_label = QtWidgets.QLabel("Metadata")
+        meta_label.setStyleSheet("font-weight: 600; color: #cfcfcf;")
+        meta_layout.addWidget(meta_label)
+
+        self.ckpt_label = QtWidgets.QLabel("ckpt_name: -")
+        self.ckpt_label.setStyleSheet("color: #9aa0a6;")
+        self.ckpt_label.setWordWrap(True)
+        meta_layout.addWidget(self.ckpt_label)
+
+        self.sampler_label = QtWidgets.QLabel("sampler_name: -")
+        self.sampler_label.setStyleSheet("color: #9aa0a6;")
+        self.sampler_label.setWordWrap(True)
+        meta_layout.addWidget(self.sampler_label)
+
+        self.meta_view = QtWidgets.QTextEdit()
+        self.meta_view.setReadOnly(True)
+        self.meta_view.setFontFamily("Consolas")
+        self.meta_view.setStyleSheet(
+            "background: #101114; color: #f0f0f0; border: 1px solid #2b2e35;"
+        )
+        self.meta_view.setMinimumWidth(320)
+        self.meta_view.setPlainText("Loading metadata...")
+        meta_layout.addWidget(self.meta_view, 1)
+
+        body.addWidget(meta_container, 2)
+
+        footer = QtWidgets.QHBoxLayout()
+        layout.addLayout(footer)
+        footer.addStretch()
+
+        zoom_out = QtWidgets.QPushButton("-")
+        zoom_out.clicked.connect(lambda: self.image_view.adjust_zoom(-0.2))
+        zoom_reset = QtWidgets.QPushButton("Reset")
+        zoom_reset.clicked.connect(lambda: self.image_view.set_zoom(1.0))
+        zoom_in = QtWidgets.QPushButton("+")
+        zoom_in.clicked.connect(lambda: self.image_view.adjust_zoom(0.2))
+        footer.addWidget(zoom_out)
+        footer.addWidget(zoom_reset)
+        footer.addWidget(zoom_in)
+
+        self.load_preview()
+        self.load_metadata()
+
+    def load_preview(self):
+        if self.original_pixmap.isNull():
+            self.image_view.set_pixmap(QtGui.QPixmap())
+            return
+        self.image_view.set_pixmap(self.original_pixmap)
+        QtCore.QTimer.singleShot(0, self.image_view.fit_to_view)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.start_animation()
+
+    def hideEvent(self, event):
+        self.stop_animation()
+        super().hideEvent(event)
+
+    def start_animation(self):
+        if self.movie is not None or self.original_pixmap.isNull():
+            return
+        movie = open_animation(self.path, DIALOG_FRAME_BUDGET)
+        if movie is None:
+            return
+        self.movie = movie
+        movie.frameChanged.connect(self.show_frame)
+        movie.start()
+
+    def stop_animation(self):
+        if self.movie is None:
+            return
+        movie = self.movie
+        self.movie = None
+        movie.stop()
+        movie.deleteLater()
+        self.image_view.update_frame(self.original_pixmap)
+
+    def show_frame(self, _frame):
+        if self.movie is not None:
+            self.image_view.update_frame(self.movie.currentPixmap())
+
+    def load_metadata(self):
+        if not self.path or not os.path.exists(self.path):
+            self.ckpt_label.setText("ckpt_name: -")
+            self.sampler_label.setText("sampler_name: -")
+            self.meta_view.setPlainText("Unable to load metadata for this file.")
+            return
+        try:
+            json_text, ckpt_name, sampler_names = ensure_metadata(
+                self.cache_conn, self.path
+            )
+            ckpt_display = ckpt_name or "-"
+            sampler_display = ", ".join(sampler_names) if sampler_names else "-"
+            self.ckpt_label.setText(f"ckpt_name: {ckpt_display}")
+            self.sampler_label.setText(f"sampler_name: {sampler_display}")
+            if json_text:
+                self.meta_view.setPlainText(pretty_json_text(json_text))
+            else:
+                self.meta_view.setPlainText("No JSON metadata found.")
+        except OSError:
+            self.ckpt_label.setText("ckpt_name: -")
+            self.sampler_label.setText("sampler_name: -")
+            self.meta_view.setPlainText("Unable to load metadata for this file.")
+
+
+class ImageCard(QtWidgets.QFrame):
+    def __init__(
+        self,
+        date,
+        number,
+        path,
+        cache_conn=None,
+        pending=False,
+        editable=False,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.date = date
+        self.number = number
+        self.path = path
+        self.cache_conn = cache_conn
+        self.static_pixmap = None
+        self.animatable = False
+        self.movie = None
+        self.setFrameShape(qt_frame_styled_panel())
+        self.setStyleSheet(
+            "QFrame { background: #1c1e22; border: 1px solid #2c2f36; border-radius: 10px; }"
+        )
+        self.setCursor(QtGui.QCursor(qt_cursor_pointing()))
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(6)
+
+        self.thumb = QtWidgets.QLabel("Searching for matching file...")
+        self.thumb.setAlignment(qt_align_center())
+        self.thumb.setStyleSheet("background: #25282e; color: #9aa0a6;")
+        self.thumb.setFixedHeight(160)
+        layout.addWidget(self.thumb)
+
+        title_row = QtWidgets.QHBoxLayout()
+        num_label = QtWidgets.QLabel(f"#{number}")
+        num_label.setStyleSheet("font-weight: 600;")
+        title_row.addWidget(num_label)
+        title_row.addStretch()
+        self.favorite = True
+        self.fav_button = None
+        if editable:
+            self.fav_button = QtWidgets.QToolButton()
+            self.fav_button.setStyleSheet("border: none; font-size: 16px;")
+            self.fav_button.clicked.connect(self.toggle_favorite)
+            title_row.addWidget(self.fav_button)
+            self.update_favorite_button()
+        layout.addLayout(title_row)
+
+        self.file_label = QtWidgets.QLabel("Scanning folder...")
+        self.file_label.setStyleSheet("color: #9aa0a6;")
+        self.file_label.setWordWrap(True)
+        layout.addWidget(self.file_label)
+
+        self.setFocusPolicy(qt_focus_strong())
+
+        if not pending:
+            self.apply_path(path)
+
+    def apply_path(self, path):
+        self.stop_animation()
+        self.animatable = False
+        self.path = path
+        if not path:
+            self.thumb.setText("No matching file found.")
+            self.file_label.setText("Missing preview.")
+            self.setCursor(QtGui.QCursor(qt_cursor_arrow()))
+            return
+        filename = os.path.basename(path)
+        self.file_label.setText(filename)
+        pixmap = QtGui.QPixmap(path)
+        if pixmap.isNull():
+            self.thumb.setText("Preview unavailable.")
+            return
+        scaled = pixmap.scaled(
+            self.thumb.width(), self.thumb.height(), qt_keep_aspect(), qt_smooth()
+        )
+        self.thumb.setPixmap(scaled)
+        self.static_pixmap = scaled
+        self.animatable = (
+            ANIMATE_ON_HOVER and os.path.splitext(path)[1].lower() in ANIMATED_EXTS
+        )
+
+    def update_favorite_button(self):
+        if self.favorite:
+            self.fav_button.setText("\u2605")
+            self.fav_button.setToolTip("Remove from favorites")
+        else:
+            self.fav_button.setText("\u2606")
+            self.fav_button.setToolTip("Add to favorites")
+
+    def toggle_favorite(self):
+        if self.favorite:
+            changed = remove_favorite(self.cache_conn, self.date, self.number)
+        else:
+            changed = add_favorite(self.cache_conn, self.date, self.number)
+        if changed:
+            self.favorite = not self.favorite
+            self.update_favorite_button()
+
+    def start_animation(self):
+        if not self.animatable or self.movie is not None:
+            return
+        movie = open_animation(self.path, CARD_FRAME_BUDGET, self.thumb.size())
+        if movie is None:
+            self.animatable = False
+            return
+        self.movie = movie
+        self.thumb.setMovie(movie)
+        movie.start()
+
+    def stop_animation(self):
+        if self.movie is None:
+            return
+        movie = self.movie
+        self.movie = None
+        movie.stop()
+        self.thumb.clear()
+        if self.static_pixmap is not None:
+            self.thumb.setPixmap(self.static_pixmap)
+        movie.deleteLater()
+
+    def enterEvent(self, event):
+        self.start_animation()
+        super().enterEvent(event)
+
+    def leaveEvent(self, event):
+        self.stop_animation()
+        super().leaveEvent(event)
+
+    def hideEvent(self, event):
+        self.stop_animation()
+        super().hideEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() == qt_mouse_left() and self.path:
+            self.stop_animation()
+            dialog = ImageDialog(
+                self.path,
+                f"{self.date} / {self.number}",
+                cache_conn=self.cache_conn,
+                parent=self,
+            )
+            dialog.exec()
+        super().mousePressEvent(event)
+
+
+class WorkerSignals(QtCore.QObject):
+    resolved = QtCore.pyqtSignal(int, object, object)
+    maintained = QtCore.pyqtSignal(object, object)
+
+
+class FavoritesViewer(QtWidgets.QMainWindow):
+    def __init__(self, roots, since=None, until=None):
+        super().__init__()
+        self.roots = roots
+        self.since = since
+        self.until = until
+        self.load_generation = 0
+        self.pending_futures = []
+        self.pending_count = 0
+        self.signals = WorkerSignals(self)
+        self.signals.resolved.connect(self.on_path_resolved)
+        self.signals.maintained.connect(self.on_maintained)
+        self.maintenance_started = False
+        self.setWindowTitle("ComfyUI Favorites Viewer")
+        self.resize(1200, 800)
+
+        central = QtWidgets.QWidget()
+        self.setCentralWidget(central)
+
+        outer = QtWidgets.QVBoxLayout(central)
+        outer.setContentsMargins(16, 16, 16, 16)
+        outer.setSpacing(12)
+
+        header = QtWidgets.QHBoxLayout()
+        outer.addLayout(header)
+
+        title = QtWidgets.QLabel("Favorites Viewer")
+        title.setStyleSheet("font-size: 20px; font-weight: 700;")
+        header.addWidget(title)
+        header.addStretch()
+
+        if any(root.favorites_store for root in self.roots):
+            add_btn = QtWidgets.QPushButton("Add favorite")
+            add_btn.clicked.connect(self.prompt_add_favorite)
+            header.addWidget(add_btn)
+            export_btn = QtWidgets.QPushButton("Export fav.yaml")
+            export_btn.clicked.connect(self.export_favorites)
+            header.addWidget(export_btn)
+
+        reload_btn = QtWidgets.QPushButton("Reload")
+        reload_btn.clicked.connect(self.load_sections)
+        header.addWidget(reload_btn)
+
+        self.status = QtWidgets.QLabel("Ready.")
+        self.status.setStyleSheet("color: #9aa0a6;")
+        outer.addWidget(self.status)
+
+        self.scroll = QtWidgets.QScrollArea()
+        self.scroll.setWidgetResizable(True)
+        outer.addWidget(self.scroll, 1)
+
+        self.scroll_widget = QtWidgets.QWidget()
+        self.scroll_layout = QtWidgets.QVBoxLayout(self.scroll_widget)
+        self.scroll_layout.setSpacing(18)
+        self.scroll_layout.addStretch()
+        self.scroll.setWidget(self.scroll_widget)
+
+        self.section_grids = []
+        self.columns = 0
+        self.reflow_timer = QtCore.QTimer(self)
+        self.reflow_timer.setSingleShot(True)
+        self.reflow_timer.setInterval(REFLOW_DELAY_MS)
+        self.reflow_timer.timeout.connect(self.reflow_sections)
+        self.scroll.viewport().installEventFilter(self)
+
+        self.maintenance_timer = QtCore.QTimer(self)
+        self.maintenance_timer.setSingleShot(True)
+        self.maintenance_timer.setInterval(MAINTENANCE_IDLE_MS)
+        self.maintenance_timer.timeout.connect(self.run_maintenance)
+        self.user_input_events = qt_user_input_events()
+        QtWidgets.QApplication.instance().installEventFilter(self)
+
+        QtCore.QTimer.singleShot(0, self.load_sections)
+
+    def eventFilter(self, obj, event):
+        if obj is self.scroll.viewport() and event.type() == qt_event_resize():
+            self.reflow_timer.start()
+        elif (
+            event.type() in self.user_input_events
+            and self.maintenance_timer.isActive()
+        ):
+            self.maintenance_timer.start()
+        return super().eventFilter(obj, event)
+
+    def compute_columns(self):
+        viewport_width = self.scroll.viewport().width()
+        return max(1, viewport_width // CARD_COLUMN_WIDTH) if viewport_width else 4
+
+    def place_cards(self, grid, cards, columns):
+        for card in cards:
+            grid.removeWidget(card)
+        for index, card in enumerate(cards):
+            grid.addWidget(card, index // columns, index % columns)
+
+    def reflow_sections(self):
+        columns = self.compute_columns()
+        if columns == self.columns:
+            return
+        self.columns = columns
+        for grid, cards in self.section_grids:
+            self.place_cards(grid, cards, columns)
+
+    def clear_sections(self):
+        self.reflow_timer.stop()
+        self.maintenance_timer.stop()
+        self.section_grids = []
+        self.load_generation += 1
+        for future in self.pending_futures:
+            future.cancel()
+        self.pending_futures = []
+        self.pending_count = 0
+        while self.scroll_layout.count() > 1:
+            item = self.scroll_layout.takeAt(0)
+            widget = item.widget()
+            if widget is not None:
+                widget.deleteLater()
+
+    def closeEvent(self, event):
+        for future in self.pending_futures:
+            future.cancel()
+        for root in self.roots:
+            root.close()
+        super().closeEvent(event)
+
+    def deliver_path(self, generation, card, future):
+        if future.cancelled():
+            return
+        try:
+            path = future.result()
+        except (OSError, sqlite3.Error):
+            path = None
+        self.signals.resolved.emit(generation, card, path)
+
+    def on_path_resolved(self, generation, card, path):
+        if generation != self.load_generation:
+            return
+        card.apply_path(path)
+        self.pending_count -= 1
+        if self.pending_count == 0:
+            self.pending_futures = []
+            self.status.setText(self.loaded_status())
+            self.maintenance_timer.start()
+
+    def prompt_add_favorite(self):
+        stores = [root for root in self.roots if root.favorites_store]
+        if not stores:
+            return
+        root = stores[0]
+        if len(stores) > 1:
+            names = [store.base_dir for store in stores]
+            choice, ok = QtWidgets.QInputDialog.getItem(
+                self, "Add favorite", "Library:", names, 0, False
+            )
+            if not ok:
+                return
+            root = stores[names.index(choice)]
+        date, ok = QtWidgets.QInputDialog.getText(self, "Add favorite", "Date folder:")
+        if not ok or not date.strip():
+            return
+        number, ok = QtWidgets.QInputDialog.getText(self, "Add favorite", "Number:")
+        if not ok or not number.strip():
+            return
+        if add_favorite(root.cache_conn, date.strip(), number.strip()):
+            self.load_sections()
+
+    def export_favorites(self):
+        stores = [root for root in self.roots if root.favorites_store]
+        for root in stores:
+            root.ensure_favorites_imported()
+        changed = [root.fav_path for root in stores if root.favorites_warning]
+        if changed:
+            self.status.setText(self.loaded_status())
+            QtWidgets.QMessageBox.warning(
+                self,
+                "Export fav.yaml",
+                "These files changed on disk since they were imported:\n\n"
+                + "\n".join(changed)
+                + "\n\nExporting would discard those changes. Run "
+                "'viewer.py import-favorites' to take the file's version or "
+                "'viewer.py export-favorites' to keep the viewer's.",
+            )
+            return
+        answer = QtWidgets.QMessageBox.question(
+            self,
+            "Export fav.yaml",
+            "Replace these files with the favorites shown in the viewer?\n\n"
+            + "\n".join(root.fav_path for root in stores)
+            + "\n\nComments and formatting in them will be lost.",
+            qt_message_yes() | qt_message_no(),
+            qt_message_no(),
+        )
+        if answer != qt_message_yes():
+            return
+        counts = []
+        for root in stores:
+            try:
+                count = root.export_favorites()
+            except (OSError, sqlite3.Error) as exc:
+                self.status.setText(f"Export to {root.fav_path} failed: {exc}")
+                return
+            counts.append(f"{count} to {root.fav_path}")
+        self.status.setText(f"Exported favorites: {', '.join(counts)}")
+
+    def loaded_status(self):
+        warnings = [
+            root.favorites_warning for root in self.roots if root.favorites_warning
+        ]
+        return "; ".join(warnings) if warnings else "Loaded favorites."
+
+    def run_maintenance(self):
+        if self.maintenance_started or self.pending_count:
+            return
+        self.maintenance_started = True
+        for root in self.roots:
+            future = root.executor.submit(root.maintain, vacuum=False)
+            future.add_done_callback(functools.partial(self.deliver_report, root))
+
+    def deliver_report(self, root, future):
+        if future.cancelled():
+            return
+        try:
+            report = future.result()
+        except (OSError, sqlite3.Error):
+            return
+        if report is not None:
+            self.signals.maintained.emit(root, report)
+
+    def on_maintained(self, root, report):
+        self.status.setText(f"Cache maintenance {root.base_dir}: {format_report(report)}")
+
+    def load_sections(self):
+        self.status.setText("Loading favorites...")
+        self.clear_sections()
+        sections = merge_sections(self.roots, self.since, self.until)
+        if not sections:
+            self.status.setText("No dates found in fav.yaml.")
+            return
+
+        columns = self.compute_columns()
+        self.columns = columns
+
+        generation = self.load_generation
+        for section in sections:
+            if not section["entries"]:
+                continue
+            date = section["date"]
+            entries = section["entries"]
+
+            container = QtWidgets.QFrame()
+            container.setStyleSheet(
+                "QFrame { background: #191b1f; border: 1px solid #2a2d33; border-radius: 12px; }"
+            )
+            container_layout = QtWidgets.QVBoxLayout(container)
+            container_layout.setContentsMargins(14, 14, 14, 14)
+
+            header = QtWidgets.QHBoxLayout()
+            date_label = QtWidgets.QLabel(date)
+            date_label.setStyleSheet("font-weight: 600; font-size: 16px;")
+            count_label = QtWidgets.QLabel(f"{len(entries)} favorites")
+            count_label.setStyleSheet("color: #9aa0a6;")
+            header.addWidget(date_label)
+            header.addStretch()
+            header.addWidget(count_label)
+            container_layout.addLayout(header)
+
+            grid = QtWidgets.QGridLayout()
+            grid.setHorizontalSpacing(12)
+            grid.setVerticalSpacing(12)
+            container_layout.addLayout(grid)
+
+            cards = []
+            for root, number in entries:
+                card = ImageCard(
+                    date,
+                    number,
+                    None,
+                    cache_conn=root.cache_conn,
+                    pending=True,
+                    editable=root.favorites_store,
+                )
+                cards.append(card)
+                future = root.submit(date, number)
+                self.pending_futures.append(future)
+                self.pending_count += 1
+                future.add_done_callback(
+                    functools.partial(self.deliver_path, generation, card)
+                )
+            self.place_cards(grid, cards, columns)
+            self.section_grids.append((grid, cards))
+
+            self.scroll_layout.insertWidget(self.scroll_layout.count() - 1, container)
+
+        if self.pending_count == 0:
+            self.status.setText(self.loaded_status())
+            self.maintenance_timer.start()
+
+
+def run(roots, qt_args=(), since=None, until=None):
+    app = QtWidgets.QApplication(sys.argv[:1] + list(qt_args))
+    app.setStyleSheet(
+        """
+        QMainWindow, QWidget {
+            background-color: #141417;
+            color: #e6e6e6;
+        }
+        QLabel {
+            color: #e6e6e6;
+        }
+        QScrollArea {
+            background-color: transparent;
+        }
+        QScrollArea > QWidget > QWidget {
+            background-color: transparent;
+        }
+        QPushButton {
+            background-color: #2a2d33;
+            color: #e6e6e6;
+            border: 1px solid #3a3d44;
+            border-radius: 6px;
+            padding: 6px 12px;
+        }
+        QPushButton:hover {
+            background-color: #343842;
+        }
+        QTextEdit {
+            background-color: #101114;
+            color: #e6e6e6;
+            border: 1px solid #2b2e35;
+            border-radius: 6px;
+        }
+        """
+    )
+    viewer = FavoritesViewer(roots, since=since, until=until)
+    viewer.showMaximized()
+    return app.exec()
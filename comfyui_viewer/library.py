@@ -0,0 +1,311 @@
+import json
+import os
+import sqlite3
+import threading
+
+from .cache import (
+    JOURNAL_MODES,
+    get_cached_metadata,
+    get_cached_path,
+    get_meta,
+    get_node_params,
+    open_cache,
+    resolve_journal_mode,
+    set_meta,
+    update_cache,
+    update_metadata_cache,
+)
+from .favorites import (
+    export_fav_yaml,
+    fav_yaml_mtime,
+    import_fav_yaml,
+    in_date_range,
+    load_favorite_sections,
+    parse_fav_yaml,
+)
+from .metadata import extract_json_from_file, extract_metadata
+
+DEFAULT_ROOT_CONCURRENCY = 4
+
+IMAGE_EXTS = {
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".webp",
+    ".gif",
+    ".bmp",
+    ".tif",
+    ".tiff",
+    ".avif",
+}
+
+ANIMATED_EXTS = {".gif", ".webp"}
+
+
+class RootConfigError(ValueError):
+    pass
+
+
+def check_root_dir(path):
+    if not os.path.isdir(path):
+        raise RootConfigError(f"{path}: library root is not an existing directory")
+    return path
+
+
+def is_image_file(name):
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTS
+
+
+def find_file_for_number(base_dir, date, number, cache_conn=None):
+    cached = get_cached_path(cache_conn, date, number)
+    if cached:
+        return cached
+    folder = os.path.join(base_dir, date)
+    if not os.path.isdir(folder):
+        return None
+    try:
+        entries = os.listdir(folder)
+    except OSError:
+        return None
+    files = [name for name in entries if os.path.isfile(os.path.join(folder, name))]
+    for name in files:
+        if number in name and is_image_file(name):
+            path = os.path.join(folder, name)
+            update_cache(cache_conn, date, number, path)
+            return path
+    for name in files:
+        if number in name:
+            path = os.path.join(folder, name)
+            update_cache(cache_conn, date, number, path)
+            return path
+    return None
+
+
+def ensure_metadata(conn, path):
+    cached = get_cached_metadata(conn, path)
+    if cached is not None and (
+        cached["metadata_json"] is not None or cached["params_indexed"]
+    ):
+        json_text = cached["metadata_json"]
+        ckpt_name = cached["ckpt_name"]
+        sampler_names = cached["samplers"]
+        if json_text and not cached["params_indexed"]:
+            ckpt_name, sampler_names, params = extract_metadata(json_text)
+            update_metadata_cache(
+                conn, path, json_text, ckpt_name, sampler_names, params
+            )
+        return json_text, ckpt_name, sampler_names
+    json_text = extract_json_from_file(path)
+    ckpt_name, sampler_names, params = extract_metadata(json_text)
+    cached_json = json_text if json_text is not None else ""
+    update_metadata_cache(conn, path, cached_json, ckpt_name, sampler_names, params)
+    return json_text, ckpt_name, sampler_names
+
+
+def make_executor(max_workers, thread_name_prefix):
+    import concurrent.futures
+
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix=thread_name_prefix
+    )
+
+
+class LibraryRoot:
+    def __init__(
+        self,
+        base_dir,
+        concurrency=DEFAULT_ROOT_CONCURRENCY,
+        favorites_store=False,
+        journal_mode="auto",
+    ):
+        self.base_dir = check_root_dir(os.path.abspath(base_dir))
+        self.concurrency = max(1, int(concurrency))
+        self.fav_path = os.path.join(self.base_dir, "fav.yaml")
+        self.journal_mode = resolve_journal_mode(self.base_dir, journal_mode)
+        self.cache_conn = open_cache(self.base_dir, self.journal_mode)
+        self._owner_thread = threading.get_ident()
+        self._local = threading.local()
+        self._thread_conns = []
+        self._thread_conns_lock = threading.Lock()
+        self.favorites_store = bool(favorites_store)
+        self.favorites_warning = None
+        if self.favorites_store:
+            self.ensure_favorites_imported()
+        self.executor = make_executor(
+            self.concurrency, f"scan-{os.path.basename(self.base_dir)}"
+        )
+
+    def thread_conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                conn = open_cache(
+                    self.base_dir, self.journal_mode, check_same_thread=False
+                )
+            except (OSError, sqlite3.Error):
+                return None
+            self._local.conn = conn
+            with self._thread_conns_lock:
+                self._thread_conns.append(conn)
+        return conn
+
+    def connection(self):
+        if threading.get_ident() == self._owner_thread and self.cache_conn:
+            return self.cache_conn
+        return self.thread_conn()
+
+    def ensure_favorites_imported(self, conn=None):
+        conn = conn or self.connection()
+        mtime = fav_yaml_mtime(self.fav_path)
+        if get_meta(conn, "favorites_imported"):
+            synced = get_meta(conn, "fav_yaml_mtime")
+            if synced is None:
+                set_meta(conn, "fav_yaml_mtime", str(mtime or ""))
+                conn.commit()
+                return
+            if mtime is None or mtime <= int(synced or 0):
+                return
+            if get_meta(conn, "favorites_edited"):
+                self.favorites_warning = (
+                    f"{self.fav_path} changed on disk, keeping the favorites "
+                    "edited in the viewer; export or import to sync"
+                )
+                return
+        self.import_favorites(conn=conn)
+
+    def import_favorites(self, path=None, conn=None):
+        conn = conn or self.connection()
+        count = import_fav_yaml(conn, path or self.fav_path)
+        self.mark_favorites_synced(conn)
+        return count
+
+    def export_favorites(self, path=None, conn=None):
+        conn = conn or self.connection()
+        count = export_fav_yaml(conn, path or self.fav_path)
+        if path is None or os.path.abspath(path) == self.fav_path:
+            self.mark_favorites_synced(conn)
+        return count
+
+    def mark_favorites_synced(self, conn):
+        mtime = fav_yaml_mtime(self.fav_path)
+        set_meta(conn, "favorites_imported", "1")
+        set_meta(conn, "fav_yaml_mtime", str(mtime or ""))
+        set_meta(conn, "favorites_edited", None)
+        conn.commit()
+        self.favorites_warning = None
+
+    def load_sections(self, start=None, end=None, conn=None):
+        if self.favorites_store:
+            conn = conn or self.connection()
+            self.ensure_favorites_imported(conn)
+            return load_favorite_sections(conn, start, end)
+        return [
+            section
+            for section in parse_fav_yaml(self.fav_path)
+            if in_date_range(section["date"], start, end)
+        ]
+
+    def resolve(self, date, number):
+        return find_file_for_number(self.base_dir, date, number, self.thread_conn())
+
+    def submit(self, date, number):
+        return self.executor.submit(self.resolve, date, number)
+
+    def cached_metadata(self, path):
+        conn = self.connection()
+        cached = get_cached_metadata(conn, path)
+        if cached is None:
+            return None
+        cached["params"] = get_node_params(conn, path)
+        return cached
+
+    def maintain(self, cap_bytes=None, vacuum=True, integrity_check=True):
+        from .maintenance import favorite_keys, maintain_cache
+
+        conn = self.thread_conn()
+        if conn is None:
+            return None
+        if self.favorites_store or os.path.exists(self.fav_path):
+            favorites = favorite_keys(self.load_sections(conn=conn))
+        else:
+            favorites = None
+        return maintain_cache(
+            conn,
+            favorites=favorites,
+            cap_bytes=cap_bytes,
+            vacuum=vacuum,
+            integrity_check=integrity_check,
+            base_dir=self.base_dir,
+        )
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        with self._thread_conns_lock:
+            conns = self._thread_conns
+            self._thread_conns = []
+        self._local = threading.local()
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        if self.cache_conn:
+            self.cache_conn.close()
+            self.cache_conn = None
+
+
+def load_roots_config(path):
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError) as exc:
+        raise RootConfigError(f"{path}: unable to read roots config: {exc}") from exc
+    config_dir = os.path.dirname(os.path.abspath(path))
+    entries = data.get("roots", []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise RootConfigError(f"{path}: 'roots' must be a list")
+    roots = []
+    for index, entry in enumerate(entries):
+        if isinstance(entry, str):
+            entry = {"path": entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get("path"), str):
+            raise RootConfigError(f"{path}: root entry {index} needs a 'path' string")
+        concurrency = entry.get("concurrency", DEFAULT_ROOT_CONCURRENCY)
+        if isinstance(concurrency, bool) or not isinstance(concurrency, int):
+            raise RootConfigError(
+                f"{path}: root entry {index} has a non-integer 'concurrency'"
+            )
+        journal_mode = entry.get("journal_mode", "auto")
+        if journal_mode not in JOURNAL_MODES:
+            raise RootConfigError(
+                f"{path}: root entry {index} has 'journal_mode' {journal_mode!r}, "
+                f"expected one of {', '.join(JOURNAL_MODES)}"
+            )
+        options = {
+            "concurrency": concurrency,
+            "favorites_store": bool(entry.get("favorites_store", False)),
+            "journal_mode": journal_mode,
+        }
+        root_path = os.path.join(config_dir, os.path.expanduser(entry["path"]))
+        roots.append((os.path.abspath(root_path), options))
+    return roots
+
+
+def merge_sections(roots, start=None, end=None, loader=None):
+    sections = []
+    section_index = {}
+    for root in roots:
+        if loader is None:
+            root_sections = root.load_sections(start, end)
+        else:
+            root_sections = loader(root, start, end)
+        for section in root_sections:
+            date = section["date"]
+            entry = section_index.get(date)
+            if entry is None:
+                entry = {"date": date, "entries": []}
+                section_index[date] = entry
+                sections.append(entry)
+            for number in section["numbers"]:
+                entry["entries"].append((root, number))
+    return sections
@@ -0,0 +1,203 @@
+import os
+import sqlite3
+import time
+
+from .cache import delete_node_params
+from .thumbnails import prune_thumbnails, remove_thumbnail, thumbnails_size
+
+PRUNE_BATCH_SIZE = 500
+TRIM_BATCH_SIZE = 50
+
+
+def cache_size_bytes(conn):
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+
+def used_bytes(conn):
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return (page_count - freelist_count) * page_size
+
+
+def favorite_keys(sections):
+    keys = set()
+    for section in sections:
+        for number in section["numbers"]:
+            keys.add((section["date"], number))
+    return keys
+
+
+def prune_rows(conn, favorites=None, batch_size=PRUNE_BATCH_SIZE, base_dir=None):
+    missing = 0
+    unfavorited = 0
+    last_rowid = 0
+    check_missing = base_dir is None or os.path.isdir(base_dir)
+    while True:
+        rows = conn.execute(
+            """
+            SELECT rowid, date, number, path FROM file_cache
+            WHERE rowid > ?
+            ORDER BY rowid
+            LIMIT ?
+            """,
+            (last_rowid, batch_size),
+        ).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+        stale = []
+        for rowid, date, number, path in rows:
+            if favorites is not None and (date, number) not in favorites:
+                unfavorited += 1
+                stale.append((rowid,))
+            elif check_missing and not (path and os.path.exists(path)):
+                missing += 1
+                stale.append((rowid,))
+        if stale:
+            conn.executemany("DELETE FROM file_cache WHERE rowid = ?", stale)
+            conn.commit()
+    conn.execute(
+        "DELETE FROM param_files WHERE path NOT IN (SELECT path FROM file_cache)"
+    )
+    cursor = conn.execute(
+        """
+        DELETE FROM node_params
+        WHERE file_id NOT IN (SELECT id FROM param_files)
+        """
+    )
+    conn.commit()
+    return missing, unfavorited, cursor.rowcount
+
+
+def trim_cache(conn, cap_bytes, base_dir=None, batch_size=TRIM_BATCH_SIZE):
+    thumbs = thumbnails_size(base_dir) if base_dir is not None else 0
+    trimmed = 0
+    thumbs_freed = 0
+    last_rowid = 0
+    while used_bytes(conn) + thumbs > cap_bytes:
+        rows = conn.execute(
+            """
+            SELECT rowid, path, length(metadata_json) > 0 OR params_indexed IS NOT NULL
+            FROM file_cache
+            WHERE rowid > ?
+            ORDER BY rowid
+            LIMIT ?
+            """,
+            (last_rowid, batch_size),
+        ).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+        cleared = [(rowid, path) for rowid, path, has_metadata in rows if has_metadata]
+        conn.executemany(
+            """
+            UPDATE file_cache
+            SET metadata_json = NULL, ckpt_name = NULL, sampler_name1 = NULL,
+                sampler_name2 = NULL, params_indexed = NULL
+            WHERE rowid = ?
+            """,
+            [(rowid,) for rowid, _ in cleared],
+        )
+        for _, path in cleared:
+            delete_node_params(conn, path)
+        conn.commit()
+        trimmed += len(cleared)
+        if base_dir is not None:
+            for _, path, _ in rows:
+                if path:
+                    freed = remove_thumbnail(base_dir, path)
+                    thumbs -= freed
+                    thumbs_freed += freed
+    return trimmed, thumbs_freed
+
+
+def maintain_cache(
+    conn,
+    favorites=None,
+    cap_bytes=None,
+    vacuum=True,
+    integrity_check=True,
+    batch_size=PRUNE_BATCH_SIZE,
+    base_dir=None,
+):
+    start = time.perf_counter()
+    size_before = cache_size_bytes(conn)
+    report = {
+        "pruned_missing": 0,
+        "pruned_unfavorited": 0,
+        "pruned_params": 0,
+        "trimmed": 0,
+        "trimmed_thumbs_bytes": 0,
+        "pruned_thumbs": 0,
+        "root_unreachable": base_dir is not None and not os.path.isdir(base_dir),
+        "vacuumed": False,
+        "integrity": None,
+    }
+    try:
+        missing, unfavorited, params = prune_rows(
+            conn, favorites, batch_size, base_dir
+        )
+        report["pruned_missing"] = missing
+        report["pruned_unfavorited"] = unfavorited
+        report["pruned_params"] = params
+        if cap_bytes is not None:
+            report["trimmed"], report["trimmed_thumbs_bytes"] = trim_cache(
+                conn, cap_bytes, None if report["root_unreachable"] else base_dir
+            )
+        if vacuum and conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+            conn.execute("VACUUM")
+            report["vacuumed"] = True
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if integrity_check:
+            rows = conn.execute("PRAGMA integrity_check").fetchall()
+            report["integrity"] = [row[0] for row in rows]
+    except sqlite3.Error as exc:
+        conn.rollback()
+        report["error"] = str(exc)
+    thumbs_freed = 0
+    if (
+        base_dir is not None
+        and not report["root_unreachable"]
+        and "error" not in report
+    ):
+        paths = [row[0] for row in conn.execute("SELECT path FROM file_cache")]
+        report["pruned_thumbs"], thumbs_freed = prune_thumbnails(base_dir, paths)
+    report["size_before"] = size_before
+    report["size_after"] = cache_size_bytes(conn)
+    report["reclaimed_bytes"] = (
+        max(0, size_before - report["size_after"])
+        + thumbs_freed
+        + report["trimmed_thumbs_bytes"]
+    )
+    report["elapsed"] = time.perf_counter() - start
+    return report
+
+
+def format_report(report):
+    parts = []
+    if report.get("root_unreachable"):
+        parts.append("root unreachable, kept rows of missing files")
+    parts += [
+        f"pruned {report['pruned_missing']} missing",
+        f"{report['pruned_unfavorited']} unfavorited",
+        f"{report['pruned_params']} param rows",
+    ]
+    if report["trimmed"]:
+        parts.append(f"trimmed {report['trimmed']} metadata entries")
+    if report["trimmed_thumbs_bytes"]:
+        trimmed_kib = report["trimmed_thumbs_bytes"] / 1024
+        parts.append(f"trimmed {trimmed_kib:.1f} KiB of thumbnails")
+    if report["pruned_thumbs"]:
+        parts.append(f"removed {report['pruned_thumbs']} thumbnails")
+    parts.append(f"reclaimed {report['reclaimed_bytes'] / 1024:.1f} KiB")
+    parts.append(f"in {report['elapsed']:.2f}s")
+    integrity = report.get("integrity")
+    if integrity is not None:
+        status = "ok" if integrity == ["ok"] else "; ".join(integrity)
+        parts.append(f"integrity {status}")
+    if "error" in report:
+        parts.append(f"error: {report['error']}")
+    return ", ".join(parts)
@@ -0,0 +1,235 @@
+import json
+import os
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PARAM_MAX_TEXT = 256
+
+
+def minify_json_text(text):
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        return text
+    return json.dumps(parsed, separators=(",", ":"), ensure_ascii=False)
+
+
+def pretty_json_text(text):
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        return text
+    return json.dumps(parsed, indent=2, ensure_ascii=False)
+
+
+def find_json_candidate(text, start_index):
+    depth = 0
+    in_string = False
+    escape = False
+    for idx in range(start_index, len(text)):
+        char = text[idx]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start_index : idx + 1]
+    return None
+
+
+def extract_json_from_text(text):
+    search_index = 0
+    while True:
+        start = text.find("{", search_index)
+        if start == -1:
+            return None
+        candidate = find_json_candidate(text, start)
+        if not candidate:
+            search_index = start + 1
+            continue
+        try:
+            parsed = json.loads(candidate)
+            return json.dumps(parsed, separators=(",", ":"), ensure_ascii=False)
+        except json.JSONDecodeError:
+            search_index = start + 1
+
+
+def extract_json_from_bytes(data, max_scan=5 * 1024 * 1024):
+    view = data[:max_scan]
+    text = view.decode("utf-8", errors="ignore")
+    return extract_json_from_text(text)
+
+
+def _collect_values(obj, key, max_count, results):
+    if len(results) >= max_count:
+        return
+    if isinstance(obj, dict):
+        for obj_key, value in obj.items():
+            if obj_key == key and not isinstance(value, (dict, list)):
+                results.append(str(value))
+                if len(results) >= max_count:
+                    return
+            _collect_values(value, key, max_count, results)
+    elif isinstance(obj, list):
+        for value in obj:
+            _collect_values(value, key, max_count, results)
+
+
+def _scalar_param(value):
+    if isinstance(value, (dict, list)):
+        return None, False
+    if isinstance(value, bool):
+        return int(value), True
+    if isinstance(value, str) and len(value) > PARAM_MAX_TEXT:
+        return None, False
+    return value, True
+
+
+def iter_node_params(parsed):
+    if not isinstance(parsed, dict):
+        return
+    nodes = parsed.get("nodes")
+    if isinstance(nodes, list):
+        for node in nodes:
+            if not isinstance(node, dict) or "id" not in node:
+                continue
+            widgets = node.get("widgets_values")
+            if isinstance(widgets, dict):
+                items = widgets.items()
+            elif isinstance(widgets, list):
+                items = ((str(index), value) for index, value in enumerate(widgets))
+            else:
+                continue
+            for key, value in items:
+                value, ok = _scalar_param(value)
+                if ok:
+                    yield str(node["id"]), node.get("type"), key, value
+        return
+    for node_id, node in parsed.items():
+        if not isinstance(node, dict) or "class_type" not in node:
+            continue
+        inputs = node.get("inputs")
+        if not isinstance(inputs, dict):
+            continue
+        for key, value in inputs.items():
+            value, ok = _scalar_param(value)
+            if ok:
+                yield str(node_id), node["class_type"], key, value
+
+
+def extract_metadata(json_text):
+    if not json_text:
+        return None, [], []
+    try:
+        parsed = json.loads(json_text)
+    except json.JSONDecodeError:
+        return None, [], []
+    params = list(iter_node_params(parsed))
+    ckpt_values = []
+    sampler_values = []
+    for _, _, key, value in params:
+        if value is None:
+            continue
+        if key == "ckpt_name" and not ckpt_values:
+            ckpt_values.append(str(value))
+        elif key == "sampler_name" and len(sampler_values) < 2:
+            sampler_values.append(str(value))
+    if not params:
+        _collect_values(parsed, "ckpt_name", 1, ckpt_values)
+        _collect_values(parsed, "sampler_name", 2, sampler_values)
+    ckpt_name = ckpt_values[0] if ckpt_values else None
+    return ckpt_name, sampler_values, params
+
+
+def extract_metadata_fields(json_text):
+    ckpt_name, sampler_values, _ = extract_metadata(json_text)
+    return ckpt_name, sampler_values
+
+
+def extract_text_from_png_chunk(chunk_type, data):
+    try:
+        if chunk_type == b"tEXt":
+            _, text = data.split(b"\x00", 1)
+            return text.decode("latin-1", errors="ignore")
+        if chunk_type == b"zTXt":
+            _, rest = data.split(b"\x00", 1)
+            if not rest:
+                return None
+            if rest[0] != 0:
+                return None
+            try:
+                text = zlib.decompress(rest[1:])
+            except zlib.error:
+                return None
+            return text.decode("latin-1", errors="ignore")
+        if chunk_type == b"iTXt":
+            _, rest = data.split(b"\x00", 1)
+            if len(rest) < 2:
+                return None
+            compressed = rest[0]
+            if compressed not in (0, 1):
+                return None
+            if rest[1] != 0 and compressed == 1:
+                return None
+            rest = rest[2:]
+            parts = rest.split(b"\x00", 2)
+            if len(parts) != 3:
+                return None
+            _, _, text = parts
+            if compressed == 1:
+                try:
+                    text = zlib.decompress(text)
+                except zlib.error:
+                    return None
+            return text.decode("utf-8", errors="ignore")
+    except ValueError:
+        return None
+    return None
+
+
+def extract_json_from_png(path):
+    try:
+        with open(path, "rb") as handle:
+            if handle.read(8) != PNG_SIGNATURE:
+                return None
+            while True:
+                header = handle.read(8)
+                if len(header) < 8:
+                    return None
+                length = int.from_bytes(header[:4], "big")
+                chunk_type = header[4:8]
+                if length < 0:
+                    return None
+                if chunk_type in (b"tEXt", b"zTXt", b"iTXt"):
+                    data = handle.read(length)
+                    handle.read(4)
+                    text = extract_text_from_png_chunk(chunk_type, data)
+                    if text:
+                        json_text = extract_json_from_text(text)
+                        if json_text:
+                            return json_text
+                else:
+                    handle.seek(length + 4, os.SEEK_CUR)
+                if chunk_type == b"IEND":
+                    return None
+    except OSError:
+        return None
+
+
+def extract_json_from_file(path, max_scan=5 * 1024 * 1024):
+    if os.path.splitext(path)[1].lower() == ".png":
+        return extract_json_from_png(path)
+    with open(path, "rb") as handle:
+        data = handle.read(max_scan)
+    return extract_json_from_bytes(data, max_scan)
@@ -0,0 +1,425 @@
+import email.utils
+import http.server
+import json
+import mimetypes
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+
+from .favorites import in_date_range
+from .library import make_executor, merge_sections
+from .thumbnails import ensure_thumbnail
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+PAGE_SIZE = 60
+MAX_PAGE_SIZE = 500
+SNAPSHOT_TTL = 5.0
+CHUNK_SIZE = 64 * 1024
+REQUEST_QUEUE_SIZE = 128
+
+GALLERY_HTML = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>ComfyUI Favorites</title>
+<style>
+body { background: #141417; color: #e6e6e6; font-family: sans-serif; margin: 16px; }
+h2 { font-size: 16px; margin: 24px 0 8px; }
+.grid { display: flex; flex-wrap: wrap; gap: 12px; }
+.card { background: #1c1e22; border: 1px solid #2c2f36; border-radius: 10px;
+        padding: 10px; width: 240px; }
+.card img { width: 240px; height: 160px; object-fit: contain; background: #25282e; }
+.card a { color: #e6e6e6; text-decoration: none; font-weight: 600; }
+#more { margin: 24px 0; padding: 6px 12px; }
+</style>
+</head>
+<body>
+<h1>Favorites</h1>
+<div id="gallery"></div>
+<button id="more">Load more</button>
+<script>
+let page = 0;
+let lastDate = null;
+let grid = null;
+async function loadPage() {
+  const response = await fetch(`/api/entries?page=${page}`);
+  const data = await response.json();
+  const gallery = document.getElementById("gallery");
+  for (const entry of data.entries) {
+    if (entry.date !== lastDate) {
+      const header = document.createElement("h2");
+      header.textContent = entry.date;
+      gallery.appendChild(header);
+      grid = document.createElement("div");
+      grid.className = "grid";
+      gallery.appendChild(grid);
+      lastDate = entry.date;
+    }
+    const card = document.createElement("div");
+    card.className = "card";
+    const link = document.createElement("a");
+    link.href = entry.image;
+    link.target = "_blank";
+    const img = document.createElement("img");
+    img.loading = "lazy";
+    img.src = entry.thumb;
+    link.appendChild(img);
+    link.appendChild(document.createElement("br"));
+    link.appendChild(document.createTextNode(`#${entry.number}`));
+    card.appendChild(link);
+    grid.appendChild(card);
+  }
+  page += 1;
+  document.getElementById("more").hidden = page >= data.pages;
+}
+document.getElementById("more").onclick = loadPage;
+loadPage();
+</script>
+</body>
+</html>
+"""
+
+
+def _quote(value):
+    return urllib.parse.quote(str(value), safe="")
+
+
+def _http_date(timestamp):
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+def parse_range(header, size):
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes=") :].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            length = int(end_text)
+            if length <= 0:
+                return False
+            start = max(0, size - length)
+            end = size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+class Gallery:
+    def __init__(self, roots, snapshot_ttl=SNAPSHOT_TTL):
+        self.roots = roots
+        self.snapshot_ttl = snapshot_ttl
+        self._lock = threading.Lock()
+        self._sections = [None] * len(roots)
+        self._loaded_at = [None] * len(roots)
+        self._refreshing = [None] * len(roots)
+        self._merged = None
+        self._loaders = [
+            make_executor(1, f"sections-{os.path.basename(root.base_dir)}")
+            for root in roots
+        ]
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            for index, loaded_at in enumerate(self._loaded_at):
+                expired = loaded_at is None or now - loaded_at > self.snapshot_ttl
+                if expired and self._refreshing[index] is None:
+                    self._refreshing[index] = self._loaders[index].submit(
+                        self.refresh, index
+                    )
+            first_loads = [
+                self._refreshing[index]
+                for index, sections in enumerate(self._sections)
+                if sections is None
+            ]
+        for future in first_loads:
+            future.result()
+        with self._lock:
+            if self._merged is None:
+                entries = []
+                for section in merge_sections(self.roots, loader=self.cached_sections):
+                    for root, number in section["entries"]:
+                        root_index = self.roots.index(root)
+                        entries.append((root_index, section["date"], number))
+                self._merged = entries, set(entries)
+            return self._merged
+
+    def cached_sections(self, root, start=None, end=None):
+        return self._sections[self.roots.index(root)] or []
+
+    def refresh(self, index):
+        root = self.roots[index]
+        try:
+            sections = root.load_sections()
+        except (OSError, sqlite3.Error):
+            sections = None
+        with self._lock:
+            if sections is not None or self._sections[index] is None:
+                self._sections[index] = sections or []
+                self._merged = None
+            self._loaded_at[index] = time.monotonic()
+            self._refreshing[index] = None
+
+    def run(self, root, func, *args):
+        return root.executor.submit(func, *args).result()
+
+    def close(self):
+        for loader in self._loaders:
+            loader.shutdown(wait=True, cancel_futures=True)
+
+    def resolve(self, root_index, date, number):
+        _, entry_set = self.snapshot()
+        if (root_index, date, number) not in entry_set:
+            return None, None
+        root = self.roots[root_index]
+        return root, self.run(root, root.resolve, date, number)
+
+    def page(self, page, per_page, since=None, until=None):
+        entries, _ = self.snapshot()
+        if since is not None or until is not None:
+            entries = [
+                entry for entry in entries if in_date_range(entry[1], since, until)
+            ]
+        total = len(entries)
+        start = page * per_page
+        items = []
+        for root_index, date, number in entries[start : start + per_page]:
+            suffix = f"{root_index}/{_quote(date)}/{_quote(number)}"
+            items.append(
+                {
+                    "root": root_index,
+                    "date": date,
+                    "number": number,
+                    "thumb": f"/thumb/{suffix}",
+                    "image": f"/image/{suffix}",
+                    "metadata": f"/api/metadata/{suffix}",
+                }
+            )
+        return {
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "pages": (total + per_page - 1) // per_page,
+            "entries": items,
+        }
+
+    def thumbnail(self, root, path):
+        thumb = self.run(root, ensure_thumbnail, root.base_dir, path)
+        return thumb or path
+
+    def metadata(self, root, path):
+        cached = self.run(root, root.cached_metadata, path)
+        if cached is None:
+            return {"cached": False}
+        metadata = None
+        if cached["metadata_json"]:
+            try:
+                metadata = json.loads(cached["metadata_json"])
+            except json.JSONDecodeError:
+                metadata = None
+        return {
+            "cached": True,
+            "ckpt_name": cached["ckpt_name"],
+            "samplers": cached["samplers"],
+            "params": [
+                {
+                    "node_id": node_id,
+                    "class_type": class_type,
+                    "key": key,
+                    "value": value,
+                }
+                for node_id, class_type, key, value in cached["params"]
+            ],
+            "metadata": metadata,
+        }
+
+
+class GalleryHandler(http.server.BaseHTTPRequestHandler):
+    server_version = "ComfyUIViewer/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_HEAD(self):
+        self.handle_request(head=True)
+
+    def do_GET(self):
+        self.handle_request(head=False)
+
+    def handle_request(self, head):
+        url = urllib.parse.urlsplit(self.path)
+        parts = [urllib.parse.unquote(part) for part in url.path.split("/") if part]
+        query = urllib.parse.parse_qs(url.query)
+        try:
+            if not parts:
+                html = GALLERY_HTML.encode("utf-8")
+                self.send_bytes(html, "text/html; charset=utf-8", head)
+            elif parts == ["api", "entries"]:
+                self.send_entries(query, head)
+            elif len(parts) == 5 and parts[:2] == ["api", "metadata"]:
+                self.send_metadata(parts[2:], head)
+            elif len(parts) == 4 and parts[0] in ("thumb", "image"):
+                self.send_image(parts[0], parts[1:], head)
+            else:
+                self.send_error(404)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def lookup(self, parts):
+        root_text, date, number = parts
+        try:
+            root_index = int(root_text)
+        except ValueError:
+            return None, None
+        return self.server.gallery.resolve(root_index, date, number)
+
+    def send_entries(self, query, head):
+        try:
+            page = max(0, int(query.get("page", ["0"])[0]))
+            per_page = int(query.get("per_page", [str(PAGE_SIZE)])[0])
+        except ValueError:
+            self.send_error(400, "page and per_page must be integers")
+            return
+        per_page = max(1, min(MAX_PAGE_SIZE, per_page))
+        since = query.get("since", [None])[0]
+        until = query.get("until", [None])[0]
+        self.send_json(self.server.gallery.page(page, per_page, since, until), head)
+
+    def send_metadata(self, parts, head):
+        root, path = self.lookup(parts)
+        if not path:
+            self.send_error(404)
+            return
+        self.send_json(self.server.gallery.metadata(root, path), head)
+
+    def send_image(self, kind, parts, head):
+        root, path = self.lookup(parts)
+        if not path:
+            self.send_error(404)
+            return
+        if kind == "thumb":
+            path = self.server.gallery.thumbnail(root, path)
+        self.send_file(path, head)
+
+    def send_json(self, payload, head):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_bytes(data, "application/json; charset=utf-8", head)
+
+    def send_bytes(self, data, content_type, head):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+    def not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return etag in tags or "*" in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since.timestamp()
+        return False
+
+    def send_file(self, path, head):
+        try:
+            handle = open(path, "rb")
+        except OSError:
+            self.send_error(404)
+            return
+        with handle:
+            stat = os.fstat(handle.fileno())
+            size = stat.st_size
+            etag = f'"{size:x}-{stat.st_mtime_ns:x}"'
+            content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            if self.not_modified(etag, stat.st_mtime):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            byte_range = None
+            if_range = self.headers.get("If-Range")
+            if if_range is None or if_range == etag:
+                byte_range = parse_range(self.headers.get("Range"), size)
+            if byte_range is False:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range:
+                start, end = byte_range
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            else:
+                start, end = 0, size - 1
+                self.send_response(200)
+            length = end - start + 1
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", _http_date(stat.st_mtime))
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if head:
+                return
+            handle.seek(start)
+            while length > 0:
+                chunk = handle.read(min(CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                length -= len(chunk)
+
+
+class GalleryServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+    def __init__(self, address, gallery, verbose=False):
+        super().__init__(address, GalleryHandler)
+        self.gallery = gallery
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        self.gallery.close()
+
+
+def make_server(roots, host=DEFAULT_HOST, port=DEFAULT_PORT, verbose=False):
+    return GalleryServer((host, port), Gallery(roots), verbose=verbose)
+
+
+def warm_thumbnails(roots):
+    futures = []
+    for section in merge_sections(roots):
+        for root, number in section["entries"]:
+            futures.append(
+                root.executor.submit(_warm_entry, root, section["date"], number)
+            )
+    return sum(1 for future in futures if future.result())
+
+
+def _warm_entry(root, date, number):
+    path = root.resolve(date, number)
+    if not path:
+        return False
+    return ensure_thumbnail(root.base_dir, path) is not None
@@ -0,0 +1,98 @@
+import hashlib
+import os
+
+THUMB_SIZE = 320
+THUMB_QUALITY = 85
+
+
+def thumbnail_dir(base_dir):
+    return os.path.join(base_dir, "cache", "thumbs")
+
+
+def thumbnail_key(path, stat=None):
+    stat = stat or os.stat(path)
+    source = f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}"
+    return hashlib.sha1(source.encode("utf-8", errors="surrogateescape")).hexdigest()
+
+
+def thumbnail_path(base_dir, key):
+    return os.path.join(thumbnail_dir(base_dir), key[:2], key + ".jpg")
+
+
+def ensure_thumbnail(base_dir, path, size=THUMB_SIZE):
+    import tempfile
+
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        target = thumbnail_path(base_dir, thumbnail_key(path))
+        if os.path.exists(target):
+            return target
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(target))
+    except OSError:
+        return None
+    try:
+        os.close(fd)
+        with Image.open(path) as image:
+            image.thumbnail((size, size))
+            image.convert("RGB").save(temp_path, "JPEG", quality=THUMB_QUALITY)
+        os.replace(temp_path, target)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return None
+    return target
+
+
+def prune_thumbnails(base_dir, paths):
+    root = thumbnail_dir(base_dir)
+    if not os.path.isdir(root):
+        return 0, 0
+    valid = set()
+    for path in paths:
+        try:
+            valid.add(thumbnail_key(path))
+        except OSError:
+            continue
+    removed = 0
+    freed = 0
+    for folder, _, names in os.walk(root):
+        for name in names:
+            key, ext = os.path.splitext(name)
+            if ext == ".jpg" and key in valid:
+                continue
+            full = os.path.join(folder, name)
+            try:
+                size = os.path.getsize(full)
+                os.remove(full)
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+    return removed, freed
+
+
+def remove_thumbnail(base_dir, path):
+    try:
+        target = thumbnail_path(base_dir, thumbnail_key(path))
+        size = os.path.getsize(target)
+        os.remove(target)
+    except OSError:
+        return 0
+    return size
+
+
+def thumbnails_size(base_dir):
+    total = 0
+    for folder, _, names in os.walk(thumbnail_dir(base_dir)):
+        for name in names:
+            try:
+                total += os.path.getsize(os.path.join(folder, name))
+            except OSError:
+                continue
+    return total
@@ -0,0 +1,39 @@
+import json
+import os
+import struct
+import zlib
+
+WORKFLOW = {
+    "3": {"class_type": "KSampler", "inputs": {"seed": 7, "sampler_name": "euler"}},
+    "10": {
+        "class_type": "CheckpointLoaderSimple",
+        "inputs": {"ckpt_name": "model.safetensors"},
+    },
+}
+
+
+def png_chunk(chunk_type, data):
+    crc = zlib.crc32(chunk_type + data) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+
+def write_png(path, workflow):
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    text = b"prompt\x00" + json.dumps(workflow).encode("utf-8")
+    with open(path, "wb") as handle:
+        handle.write(b"\x89PNG\r\n\x1a\n")
+        handle.write(png_chunk(b"IHDR", header))
+        handle.write(png_chunk(b"tEXt", text))
+        handle.write(png_chunk(b"IDAT", zlib.compress(b"\x00\x00\x00\x00")))
+        handle.write(png_chunk(b"IEND", b""))
+
+
+def write_library(base_dir, date, numbers, favorites=None, workflow=WORKFLOW):
+    folder = os.path.join(base_dir, date)
+    os.makedirs(folder, exist_ok=True)
+    for number in numbers:
+        write_png(os.path.join(folder, f"ComfyUI_{number}_.png"), workflow)
+    with open(os.path.join(base_dir, "fav.yaml"), "w") as handle:
+        handle.write(f"{date}:\n")
+        for number in numbers if favorites is None else favorites:
+            handle.write(f"  - {number}\n")
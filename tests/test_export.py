@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from comfyui_viewer import LibraryRoot  # noqa: E402
+from comfyui_viewer.export import BASE_FIELDS, check_params, export_rows  # noqa: E402
+from support import write_library, write_png  # noqa: E402
+
+DATE = "2024-01-01"
+
+
+def seeded_workflow(seed):
+    return {
+        "3": {"class_type": "KSampler", "inputs": {"seed": seed, "steps": 20}},
+        "10": {
+            "class_type": "CheckpointLoaderSimple",
+            "inputs": {"ckpt_name": f"model-{seed}.safetensors"},
+        },
+    }
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.numbers = [f"{index:05d}" for index in range(1, 41)]
+        self.favorites = list(reversed(self.numbers))
+        write_library(self.base_dir, DATE, [], favorites=self.favorites)
+        for number in self.numbers:
+            path = os.path.join(self.base_dir, DATE, f"ComfyUI_{number}_.png")
+            write_png(path, seeded_workflow(int(number)))
+        self.root = LibraryRoot(self.base_dir)
+
+    def tearDown(self):
+        self.root.close()
+        shutil.rmtree(self.base_dir)
+
+    def export_jsonl(self, **options):
+        handle = io.StringIO()
+        count = export_rows([self.root], handle, **options)
+        rows = [json.loads(line) for line in handle.getvalue().splitlines()]
+        self.assertEqual(count, len(rows))
+        return rows
+
+    def test_rows_keep_favorite_order_with_workers(self):
+        for workers in (1, 4):
+            rows = self.export_jsonl(params=["seed"], workers=workers)
+            self.assertEqual([row["number"] for row in rows], self.favorites)
+            seeds = [int(number) for number in self.favorites]
+            self.assertEqual([row["seed"] for row in rows], seeds)
+            self.assertEqual(
+                rows[0]["ckpt_name"], f"model-{int(self.favorites[0])}.safetensors"
+            )
+
+    def test_check_params_rejects_clashing_keys(self):
+        self.assertEqual(check_params(["seed", "steps", "seed"]), ["seed", "steps"])
+        for params in (["date"], ["seed", "path"], ["_needs_fill"]):
+            with self.assertRaises(ValueError):
+                check_params(params)
+        with self.assertRaises(ValueError):
+            export_rows([self.root], io.StringIO(), params=["number"])
+
+    def test_no_fill_only_reads_the_cache(self):
+        rows = self.export_jsonl(fill=False)
+        self.assertEqual(len(rows), 40)
+        self.assertTrue(all(row["path"] is None for row in rows))
+        self.assertTrue(all(row["ckpt_name"] is None for row in rows))
+
+        self.export_jsonl(workers=4)
+        rows = self.export_jsonl(fill=False, params=["steps"])
+        self.assertTrue(all(row["path"] for row in rows))
+        self.assertEqual(rows[-1]["ckpt_name"], "model-1.safetensors")
+        self.assertEqual({row["steps"] for row in rows}, {20})
+
+    def test_csv_header_lists_base_fields_then_params(self):
+        handle = io.StringIO()
+        count = export_rows(
+            [self.root], handle, fmt="csv", params=["seed", "steps"], workers=2
+        )
+        reader = csv.reader(io.StringIO(handle.getvalue()))
+        header = next(reader)
+        self.assertEqual(header, BASE_FIELDS + ["seed", "steps"])
+        rows = list(reader)
+        self.assertEqual(len(rows), count)
+        self.assertEqual(rows[0][header.index("seed")], str(int(self.favorites[0])))
+
+    def test_cli_rejects_clashing_params(self):
+        result = self.run_cli("--params", "seed,date")
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("date", result.stderr)
+        self.assertEqual(result.stdout, "")
+
+    def test_cli_exits_quietly_when_the_reader_stops(self):
+        numbers = [f"{index:05d}" for index in range(1, 3001)]
+        write_library(self.base_dir, "2024-01-02", [], favorites=numbers)
+        process = subprocess.Popen(
+            self.cli_command("--no-fill", "--workers", "4"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        self.assertTrue(process.stdout.readline().startswith("{"))
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        self.assertEqual(process.wait(timeout=30), 0)
+        self.assertEqual(stderr, "")
+
+    def cli_command(self, *args):
+        return [
+            sys.executable,
+            os.path.join(REPO_DIR, "viewer.py"),
+            "export",
+            self.base_dir,
+            *args,
+        ]
+
+    def run_cli(self, *args):
+        return subprocess.run(
+            self.cli_command(*args), capture_output=True, text=True, timeout=30
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comfyui_viewer import (  # noqa: E402
+    LibraryRoot,
+    add_favorite,
+    parse_fav_yaml,
+    remove_favorite,
+    write_fav_yaml,
+)
+from comfyui_viewer.cache import get_meta  # noqa: E402
+
+FAV_YAML = """# picked by hand
+2024-01-01:
+  - 00001
+  - 00002
+  - 00001
+
+2024-01-02:
+  # keep
+  - 00007
+"""
+
+
+class FavoritesTest(unittest.TestCase):
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.fav_path = os.path.join(self.base_dir, "fav.yaml")
+        with open(self.fav_path, "w") as handle:
+            handle.write(FAV_YAML)
+        self.root = LibraryRoot(self.base_dir, favorites_store=True)
+        self.conn = self.root.cache_conn
+
+    def tearDown(self):
+        self.root.close()
+        shutil.rmtree(self.base_dir)
+
+    def sections(self):
+        return [
+            (section["date"], section["numbers"])
+            for section in self.root.load_sections()
+        ]
+
+    def touch_fav_yaml(self, text):
+        mtime = os.stat(self.fav_path).st_mtime_ns
+        with open(self.fav_path, "w") as handle:
+            handle.write(text)
+        os.utime(self.fav_path, ns=(mtime + 10**9, mtime + 10**9))
+
+    def test_first_open_imports_fav_yaml(self):
+        self.assertEqual(
+            self.sections(),
+            [("2024-01-01", ["00001", "00002"]), ("2024-01-02", ["00007"])],
+        )
+        self.assertEqual(get_meta(self.conn, "favorites_imported"), "1")
+        self.assertIsNone(self.root.favorites_warning)
+
+    def test_export_import_round_trip(self):
+        add_favorite(self.conn, "2024-01-02", "00008")
+        remove_favorite(self.conn, "2024-01-01", "00002")
+        self.assertEqual(self.root.export_favorites(), 3)
+        self.assertEqual(
+            parse_fav_yaml(self.fav_path),
+            [
+                {"date": "2024-01-01", "numbers": ["00001"]},
+                {"date": "2024-01-02", "numbers": ["00007", "00008"]},
+            ],
+        )
+        self.assertIsNone(get_meta(self.conn, "favorites_edited"))
+        self.assertEqual(self.root.import_favorites(), 3)
+        self.assertEqual(
+            self.sections(),
+            [("2024-01-01", ["00001"]), ("2024-01-02", ["00007", "00008"])],
+        )
+
+    def test_export_elsewhere_keeps_edits_pending(self):
+        add_favorite(self.conn, "2024-01-03", "00009")
+        other = os.path.join(self.base_dir, "copy.yaml")
+        self.assertEqual(self.root.export_favorites(other), 4)
+        self.assertEqual(parse_fav_yaml(other)[-1]["numbers"], ["00009"])
+        self.assertEqual(get_meta(self.conn, "favorites_edited"), "1")
+        with open(self.fav_path) as handle:
+            self.assertEqual(handle.read(), FAV_YAML)
+
+    def test_newer_fav_yaml_is_reimported(self):
+        self.touch_fav_yaml("2024-02-01:\n  - 00100\n")
+        self.assertEqual(self.sections(), [("2024-02-01", ["00100"])])
+        self.assertIsNone(self.root.favorites_warning)
+
+    def test_unchanged_fav_yaml_is_not_reimported(self):
+        add_favorite(self.conn, "2024-01-03", "00009")
+        self.assertEqual(self.sections()[-1], ("2024-01-03", ["00009"]))
+        self.assertIsNone(self.root.favorites_warning)
+
+    def test_viewer_edits_win_over_newer_fav_yaml(self):
+        add_favorite(self.conn, "2024-01-03", "00009")
+        self.touch_fav_yaml("2024-02-01:\n  - 00100\n")
+        self.assertEqual(self.sections()[-1], ("2024-01-03", ["00009"]))
+        self.assertIn(self.fav_path, self.root.favorites_warning)
+        self.root.import_favorites()
+        self.assertIsNone(self.root.favorites_warning)
+        self.assertEqual(self.sections(), [("2024-02-01", ["00100"])])
+
+    def test_missing_sync_mtime_records_a_baseline(self):
+        add_favorite(self.conn, "2024-01-03", "00009")
+        self.conn.execute("DELETE FROM cache_meta WHERE key = 'fav_yaml_mtime'")
+        self.conn.commit()
+        self.assertEqual(self.sections()[-1], ("2024-01-03", ["00009"]))
+        synced = get_meta(self.conn, "fav_yaml_mtime")
+        self.assertEqual(synced, str(os.stat(self.fav_path).st_mtime_ns))
+        self.assertIsNone(self.root.favorites_warning)
+
+    def test_failed_write_keeps_fav_yaml_and_removes_temp_file(self):
+        with mock.patch("os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                write_fav_yaml(self.fav_path, [{"date": "x", "numbers": ["1"]}])
+        self.assertFalse(os.path.exists(self.fav_path + ".tmp"))
+        with open(self.fav_path) as handle:
+            self.assertEqual(handle.read(), FAV_YAML)
+
+
+if __name__ == "__main__":
+    unittest.main()
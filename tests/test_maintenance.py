@@ -0,0 +1,144 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comfyui_viewer import LibraryRoot, ensure_metadata, format_report  # noqa: E402
+from comfyui_viewer.maintenance import (  # noqa: E402
+    favorite_keys,
+    maintain_cache,
+    trim_cache,
+    used_bytes,
+)
+from comfyui_viewer.thumbnails import thumbnail_key, thumbnail_path  # noqa: E402
+from support import write_library  # noqa: E402
+
+DATE = "2024-01-01"
+
+
+class MaintenanceTest(unittest.TestCase):
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.numbers = [f"{index:05d}" for index in range(1, 6)]
+        write_library(self.base_dir, DATE, self.numbers)
+        self.root = LibraryRoot(self.base_dir)
+        self.conn = self.root.cache_conn
+        self.paths = {}
+        for number in self.numbers:
+            path = self.root.resolve(DATE, number)
+            ensure_metadata(self.conn, path)
+            self.paths[number] = path
+
+    def tearDown(self):
+        self.root.close()
+        shutil.rmtree(self.base_dir)
+
+    def cached_numbers(self):
+        rows = self.conn.execute("SELECT number FROM file_cache ORDER BY number")
+        return [row[0] for row in rows]
+
+    def param_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM node_params").fetchone()[0]
+
+    def write_thumbnail(self, number, size=4096):
+        key = thumbnail_key(self.paths[number])
+        target = thumbnail_path(self.base_dir, key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as handle:
+            handle.write(b"\0" * size)
+        return target
+
+    def test_prunes_missing_files(self):
+        os.remove(self.paths["00002"])
+        shutil.rmtree(os.path.join(self.base_dir, DATE))
+        os.makedirs(os.path.join(self.base_dir, DATE))
+        write_library(self.base_dir, DATE, ["00001"], favorites=self.numbers)
+        report = maintain_cache(self.conn, base_dir=self.base_dir)
+        self.assertEqual(report["pruned_missing"], 4)
+        self.assertEqual(self.cached_numbers(), ["00001"])
+        self.assertGreater(report["pruned_params"], 0)
+
+    def test_prunes_rows_when_date_folder_is_gone(self):
+        shutil.rmtree(os.path.join(self.base_dir, DATE))
+        report = maintain_cache(self.conn, base_dir=self.base_dir)
+        self.assertFalse(report["root_unreachable"])
+        self.assertEqual(report["pruned_missing"], 5)
+        self.assertEqual(self.cached_numbers(), [])
+        self.assertEqual(self.param_count(), 0)
+
+    def test_prunes_unfavorited_entries(self):
+        favorites = favorite_keys([{"date": DATE, "numbers": ["00001", "00003"]}])
+        thumb = self.write_thumbnail("00002")
+        report = maintain_cache(self.conn, favorites=favorites, base_dir=self.base_dir)
+        self.assertEqual(report["pruned_unfavorited"], 3)
+        self.assertEqual(self.cached_numbers(), ["00001", "00003"])
+        self.assertEqual(report["pruned_thumbs"], 1)
+        self.assertFalse(os.path.exists(thumb))
+
+    def test_keeps_rows_of_unreachable_root(self):
+        missing_root = os.path.join(self.base_dir, "unplugged")
+        report = maintain_cache(self.conn, favorites=None, base_dir=missing_root)
+        self.assertTrue(report["root_unreachable"])
+        self.assertEqual(report["pruned_missing"], 0)
+        self.assertEqual(self.cached_numbers(), self.numbers)
+        self.assertIn("root unreachable", format_report(report))
+
+    def test_cap_trims_metadata_params_and_thumbnails(self):
+        thumbs = [self.write_thumbnail(number) for number in self.numbers]
+        trimmed, freed = trim_cache(self.conn, 10**9, self.base_dir)
+        self.assertEqual((trimmed, freed), (0, 0))
+
+        cap = used_bytes(self.conn) + 2 * 4096
+        trimmed, freed = trim_cache(self.conn, cap, self.base_dir, batch_size=1)
+        self.assertGreater(trimmed, 0)
+        self.assertEqual(freed, 4096 * trimmed)
+        self.assertEqual(sum(os.path.exists(thumb) for thumb in thumbs), 5 - trimmed)
+
+        trimmed, _ = trim_cache(self.conn, 0, self.base_dir)
+        self.assertFalse(any(os.path.exists(thumb) for thumb in thumbs))
+        self.assertEqual(self.param_count(), 0)
+        rows = self.conn.execute(
+            "SELECT metadata_json, ckpt_name, params_indexed FROM file_cache"
+        ).fetchall()
+        self.assertEqual(rows, [(None, None, None)] * 5)
+        self.assertEqual(self.cached_numbers(), self.numbers)
+
+    def test_report(self):
+        os.remove(self.paths["00005"])
+        numbers = ["00001", "00002", "00003", "00005"]
+        favorites = favorite_keys([{"date": DATE, "numbers": numbers}])
+        self.write_thumbnail("00001")
+        report = maintain_cache(
+            self.conn, favorites=favorites, cap_bytes=0, base_dir=self.base_dir
+        )
+        self.assertEqual(report["pruned_missing"], 1)
+        self.assertEqual(report["pruned_unfavorited"], 1)
+        self.assertEqual(report["trimmed"], 3)
+        self.assertEqual(report["trimmed_thumbs_bytes"], 4096)
+        self.assertLessEqual(report["size_after"], report["size_before"])
+        self.assertEqual(report["integrity"], ["ok"])
+        self.assertGreaterEqual(report["reclaimed_bytes"], 4096)
+        text = format_report(report)
+        for part in (
+            "pruned 1 missing",
+            "1 unfavorited",
+            "trimmed 3 metadata entries",
+            "trimmed 4.0 KiB of thumbnails",
+            "integrity ok",
+        ):
+            self.assertIn(part, text)
+        self.assertNotIn("unreachable", text)
+
+    def test_root_maintain_skips_vacuum_on_request(self):
+        os.remove(self.paths["00004"])
+        report = self.root.executor.submit(self.root.maintain, vacuum=False).result()
+        self.assertEqual(report["pruned_missing"], 1)
+        self.assertEqual(report["pruned_unfavorited"], 0)
+        self.assertFalse(report["vacuumed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
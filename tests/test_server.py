@@ -0,0 +1,194 @@
+import concurrent.futures
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comfyui_viewer import LibraryRoot, make_server  # noqa: E402
+from support import write_library  # noqa: E402
+
+
+class ServerTest(unittest.TestCase):
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.numbers = [f"{index:05d}" for index in range(1, 6)]
+        write_library(self.base_dir, "2024-01-01", self.numbers)
+        self.root = LibraryRoot(self.base_dir, favorites_store=True)
+        self.server = make_server([self.root], port=0)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.root.close()
+        shutil.rmtree(self.base_dir)
+
+    def request(self, path, headers=None, method="GET"):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+        try:
+            conn.request(method, path, headers=headers or {})
+            response = conn.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        finally:
+            conn.close()
+
+    def get_json(self, path):
+        status, _, body = self.request(path)
+        self.assertEqual(status, 200)
+        return json.loads(body)
+
+    def test_index_page(self):
+        status, headers, body = self.request("/")
+        self.assertEqual(status, 200)
+        self.assertTrue(headers["Content-Type"].startswith("text/html"))
+        self.assertIn(b"/api/entries", body)
+
+    def test_entries_are_paginated(self):
+        first = self.get_json("/api/entries?page=0&per_page=2")
+        self.assertEqual(first["total"], 5)
+        self.assertEqual(first["pages"], 3)
+        numbers = [entry["number"] for entry in first["entries"]]
+        self.assertEqual(numbers, ["00001", "00002"])
+        last = self.get_json("/api/entries?page=2&per_page=2")
+        self.assertEqual([entry["number"] for entry in last["entries"]], ["00005"])
+        status, _, _ = self.request("/api/entries?page=x")
+        self.assertEqual(status, 400)
+
+    def test_date_filter(self):
+        self.assertEqual(self.get_json("/api/entries?since=2024-01-02")["total"], 0)
+        self.assertEqual(self.get_json("/api/entries?until=2024-01-01")["total"], 5)
+
+    def test_metadata_comes_from_cache(self):
+        path = "/api/metadata/0/2024-01-01/00001"
+        self.assertEqual(self.get_json(path), {"cached": False})
+        self.root.executor.submit(self.fill_metadata, "00001").result()
+        payload = self.get_json(path)
+        self.assertTrue(payload["cached"])
+        self.assertEqual(payload["ckpt_name"], "model.safetensors")
+        self.assertEqual(payload["samplers"], ["euler"])
+        self.assertEqual([param["node_id"] for param in payload["params"]][0], "3")
+
+    def fill_metadata(self, number):
+        from comfyui_viewer import ensure_metadata
+
+        path = self.root.resolve("2024-01-01", number)
+        return ensure_metadata(self.root.thread_conn(), path)
+
+    def test_image_validators_and_ranges(self):
+        status, headers, body = self.request("/image/0/2024-01-01/00002")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "image/png")
+        self.assertEqual(int(headers["Content-Length"]), len(body))
+        self.assertTrue(body.startswith(b"\x89PNG"))
+        etag = headers["ETag"]
+
+        status, _, _ = self.request(
+            "/image/0/2024-01-01/00002", {"If-None-Match": etag}
+        )
+        self.assertEqual(status, 304)
+        status, _, _ = self.request(
+            "/image/0/2024-01-01/00002",
+            {"If-Modified-Since": headers["Last-Modified"]},
+        )
+        self.assertEqual(status, 304)
+
+        status, headers, part = self.request(
+            "/image/0/2024-01-01/00002", {"Range": "bytes=0-7"}
+        )
+        self.assertEqual(status, 206)
+        self.assertEqual(part, body[:8])
+        self.assertEqual(headers["Content-Range"], f"bytes 0-7/{len(body)}")
+        status, _, tail = self.request(
+            "/image/0/2024-01-01/00002", {"Range": "bytes=-4"}
+        )
+        self.assertEqual(status, 206)
+        self.assertEqual(tail, body[-4:])
+        status, headers, _ = self.request(
+            "/image/0/2024-01-01/00002", {"Range": f"bytes={len(body)}-"}
+        )
+        self.assertEqual(status, 416)
+        self.assertEqual(headers["Content-Range"], f"bytes */{len(body)}")
+
+        status, headers, body = self.request(
+            "/image/0/2024-01-01/00002", method="HEAD"
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b"")
+
+    def test_thumbnail_falls_back_to_image(self):
+        status, headers, _ = self.request("/thumb/0/2024-01-01/00003")
+        self.assertEqual(status, 200)
+        self.assertIn(headers["Content-Type"], ("image/jpeg", "image/png"))
+
+    def test_only_favorites_are_served(self):
+        for path in (
+            "/image/0/2024-01-01/00099",
+            "/image/1/2024-01-01/00001",
+            "/image/0/..%2F..%2Fetc/passwd",
+            "/image/x/2024-01-01/00001",
+            "/nope",
+        ):
+            status, _, _ = self.request(path)
+            self.assertEqual(status, 404, path)
+
+    def test_sections_load_on_root_executor(self):
+        names = []
+        load_sections = self.root.load_sections
+
+        def record(*args, **kwargs):
+            names.append(threading.current_thread().name)
+            return load_sections(*args, **kwargs)
+
+        self.root.load_sections = record
+        self.get_json("/api/entries")
+        self.assertTrue(names)
+        self.assertTrue(all(name.startswith("sections-") for name in names), names)
+
+    def test_slow_root_does_not_block_requests(self):
+        other_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_dir)
+        write_library(other_dir, "2024-01-02", ["00042"])
+        other = LibraryRoot(other_dir)
+        self.addCleanup(other.close)
+        server = make_server([self.root, other], port=0)
+        self.addCleanup(server.server_close)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+        self.port = server.server_address[1]
+        self.assertEqual(self.get_json("/api/entries")["total"], 6)
+
+        release = threading.Event()
+        self.addCleanup(release.set)
+        load_sections = other.load_sections
+
+        def slow_load(*args, **kwargs):
+            release.wait(10)
+            return load_sections(*args, **kwargs)
+
+        other.load_sections = slow_load
+        server.gallery.snapshot_ttl = 0
+        for _ in range(3):
+            self.assertEqual(self.get_json("/api/entries")["total"], 6)
+            status, _, _ = self.request("/image/0/2024-01-01/00001")
+            self.assertEqual(status, 200)
+        self.assertFalse(release.is_set())
+
+    def test_concurrent_clients(self):
+        paths = [
+            f"/image/0/2024-01-01/{self.numbers[index % 5]}" for index in range(100)
+        ] + ["/api/entries?per_page=5"] * 50
+        with concurrent.futures.ThreadPoolExecutor(max_workers=25) as pool:
+            statuses = list(pool.map(lambda path: self.request(path)[0], paths))
+        self.assertEqual(statuses, [200] * len(paths))
+
+
+if __name__ == "__main__":
+    unittest.main()